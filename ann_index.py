@@ -0,0 +1,135 @@
+import json
+
+import numpy as np
+
+def _squared_distances(X, Y):
+    """Squared Euclidean distances between the rows of X and the rows of Y"""
+    distances = (X * X).sum(axis=1)[:, np.newaxis] - 2 * X @ Y.T + (Y * Y).sum(axis=1)
+    return np.maximum(distances, 0, out=distances)
+
+def _nearest_centroid(X, centroids, block_size=65536):
+    """Index of the nearest centroid for every row of X, computed in row blocks"""
+    # |x|^2 is the same for every centroid, so it can be left out of the argmin
+    half_norms = 0.5 * (centroids * centroids).sum(axis=1)
+    labels = np.empty(len(X), dtype=np.int64)
+    for start in range(0, len(X), block_size):
+        scores = X[start:start + block_size] @ centroids.T
+        labels[start:start + block_size] = np.argmax(scores - half_norms, axis=1)
+    return labels
+
+def kmeans(X, n_clusters, n_iter=20, seed=0):
+    """Lloyd's k-means seeded with random distinct rows; returns the (n_clusters, n_features) centroids"""
+    rng = np.random.default_rng(seed)
+    centroids = X[rng.choice(len(X), n_clusters, replace=False)].copy()
+
+    for _ in range(n_iter):
+        labels = _nearest_centroid(X, centroids)
+        counts = np.bincount(labels, minlength=n_clusters)
+        sums = np.stack([np.bincount(labels, weights=X[:, j], minlength=n_clusters)
+                         for j in range(X.shape[1])], axis=1)
+        occupied = counts > 0
+        # Empty clusters keep their previous centroid
+        centroids[occupied] = sums[occupied] / counts[occupied, np.newaxis]
+    return centroids
+
+class IVFIndex:
+    """Inverted-file approximate nearest-neighbor index over feature vectors (NumPy only)
+
+    Vectors are partitioned into nlist k-means cells. A query scans only the
+    nprobe cells whose centroids are nearest to it, so raising nprobe trades
+    latency for recall (nprobe == nlist is an exact search). New vectors can
+    be added at any time and are assigned to the existing cells; retrain when
+    the catalog's distribution has shifted a lot.
+    """
+    def __init__(self, nlist=256, nprobe=8, seed=0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.seed = seed
+        self.centroids = None
+        self._lists = None
+        self._list_ids = None
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    def __len__(self):
+        return 0 if self._list_ids is None else sum(len(ids) for ids in self._list_ids)
+
+    def train(self, X, n_iter=20, max_train_points=256):
+        """Learn the cell centroids from X, using at most max_train_points per cell"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        self.nlist = min(self.nlist, len(X))
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(len(X), self.nlist * max_train_points)
+        sample = X[rng.choice(len(X), sample_size, replace=False)] if sample_size < len(X) else X
+        self.centroids = kmeans(sample, self.nlist, n_iter=n_iter, seed=self.seed)
+        self._lists = [np.empty((0, X.shape[1]), dtype=np.float32) for _ in range(self.nlist)]
+        self._list_ids = [np.empty(0, dtype=np.int64) for _ in range(self.nlist)]
+        return self
+
+    def add(self, X, ids=None):
+        """Add vectors with integer ids (defaults to consecutive ids after the current size)"""
+        if not self.is_trained:
+            raise ValueError("Index not trained. Please call train() first.")
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        ids = np.arange(len(self), len(self) + len(X)) if ids is None else np.asarray(ids, dtype=np.int64)
+        labels = _nearest_centroid(X, self.centroids)
+        order = np.argsort(labels, kind='stable')
+        bounds = np.searchsorted(labels[order], np.arange(self.nlist + 1))
+        for cell in np.flatnonzero(np.diff(bounds)):
+            rows = order[bounds[cell]:bounds[cell + 1]]
+            self._lists[cell] = np.concatenate([self._lists[cell], X[rows]])
+            self._list_ids[cell] = np.concatenate([self._list_ids[cell], ids[rows]])
+        return ids
+
+    def search(self, queries, k=10, nprobe=None):
+        """ids and squared distances of the approximate k nearest vectors per query
+
+        Returns two (n_queries, k) arrays; rows with fewer than k candidates are
+        padded with id -1 and distance inf.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        cells = np.argpartition(_squared_distances(queries, self.centroids), nprobe - 1, axis=1)[:, :nprobe]
+
+        result_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        result_distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        for i, query in enumerate(queries):
+            candidates = np.concatenate([self._lists[cell] for cell in cells[i]])
+            if len(candidates) == 0:
+                continue
+            candidate_ids = np.concatenate([self._list_ids[cell] for cell in cells[i]])
+            distances = _squared_distances(query[np.newaxis], candidates)[0]
+            n = min(k, len(distances))
+            top = np.argpartition(distances, n - 1)[:n] if n < len(distances) else np.arange(n)
+            top = top[np.argsort(distances[top], kind='stable')]
+            result_ids[i, :n] = candidate_ids[top]
+            result_distances[i, :n] = distances[top]
+        return result_ids, result_distances
+
+    def save(self, path):
+        """Save the index to an uncompressed .npz file (no pickles)"""
+        if not self.is_trained:
+            raise ValueError("Index not trained. Please call train() first.")
+        sizes = np.array([len(ids) for ids in self._list_ids], dtype=np.int64)
+        np.savez(
+            path,
+            centroids=self.centroids,
+            vectors=np.concatenate(self._lists),
+            ids=np.concatenate(self._list_ids),
+            sizes=sizes,
+            settings=np.array(json.dumps({'nlist': self.nlist, 'nprobe': self.nprobe, 'seed': self.seed}))
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load an index saved with save()"""
+        with np.load(path, allow_pickle=False) as data:
+            index = cls(**json.loads(str(data['settings'])))
+            index.centroids = data['centroids']
+            bounds = np.concatenate([[0], np.cumsum(data['sizes'])])
+            vectors, ids = data['vectors'], data['ids']
+        index._lists = [vectors[bounds[i]:bounds[i + 1]] for i in range(index.nlist)]
+        index._list_ids = [ids[bounds[i]:bounds[i + 1]] for i in range(index.nlist)]
+        return index
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark the IVF approximate nearest-neighbor index against exact search
+Reports recall@k and per-query latency for several nprobe settings on a
+synthetic catalog of standardized track features
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from ann_index import IVFIndex, _squared_distances
+from demo import generate_synthetic_dataset
+from local_recommender import FEATURE_COLUMNS
+
+def exact_search(X, queries, k):
+    """Brute-force k nearest rows of X for each query"""
+    ids = np.empty((len(queries), k), dtype=np.int64)
+    for i, query in enumerate(queries):
+        distances = _squared_distances(query[np.newaxis], X)[0]
+        top = np.argpartition(distances, k - 1)[:k]
+        ids[i] = top[np.argsort(distances[top])]
+    return ids
+
+def recall_at_k(approximate, exact):
+    """Fraction of the exact k nearest neighbors found by the approximate search"""
+    hits = sum(len(np.intersect1d(a, e)) for a, e in zip(approximate, exact))
+    return hits / exact.size
+
+def main():
+    """Run the ANN benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark IVF recall and latency")
+    parser.add_argument('--rows', type=int, default=1000000, help="Synthetic catalog size")
+    parser.add_argument('--queries', type=int, default=200, help="Number of query tracks")
+    parser.add_argument('-k', type=int, default=20, help="Neighbors per query")
+    parser.add_argument('--nlist', type=int, default=1024, help="Number of IVF cells")
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32, 64],
+                        help="nprobe settings to compare")
+    parser.add_argument('--output', help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    df = generate_synthetic_dataset(args.rows, with_metadata=False)
+    X = df[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+    X = (X - X.mean(axis=0)) / X.std(axis=0)
+    rng = np.random.default_rng(0)
+    # Queries near, but not at, catalog tracks, like a mood target or seed track
+    queries = X[rng.choice(len(X), args.queries, replace=False)] + rng.normal(0, 0.1, (args.queries, X.shape[1]))
+    queries = queries.astype(np.float32)
+
+    start = time.perf_counter()
+    index = IVFIndex(nlist=args.nlist).train(X)
+    train_s = time.perf_counter() - start
+    start = time.perf_counter()
+    index.add(X)
+    add_s = time.perf_counter() - start
+    print(f"{args.rows:,} tracks, {args.nlist} cells: train {train_s:.1f}s, add {add_s:.1f}s")
+
+    start = time.perf_counter()
+    exact = exact_search(X, queries, args.k)
+    exact_ms = (time.perf_counter() - start) / args.queries * 1000
+    print(f"  exact          {exact_ms:8.2f} ms/query   recall@{args.k} 1.000")
+
+    results = {'rows': args.rows, 'k': args.k, 'nlist': args.nlist, 'train_s': train_s,
+               'add_s': add_s, 'exact_ms_per_query': exact_ms, 'ivf': []}
+    for nprobe in args.nprobe:
+        start = time.perf_counter()
+        approximate, _ = index.search(queries, k=args.k, nprobe=nprobe)
+        ms = (time.perf_counter() - start) / args.queries * 1000
+        recall = recall_at_k(approximate, exact)
+        print(f"  nprobe={nprobe:<6}  {ms:8.2f} ms/query   recall@{args.k} {recall:.3f}")
+        results['ivf'].append({'nprobe': nprobe, 'ms_per_query': ms, 'recall': recall})
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Compare MoodClassifier estimator backends on the same data
+Reports fit time, single-row and batch predict latency, model size and accuracy
+"""
+
+import argparse
+import io
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from mood_classifier import BACKENDS, MoodClassifier
+
+def load_dataset(filepath):
+    """Load the benchmark dataset, creating the demo dataset if none exists"""
+    if os.path.exists(filepath):
+        return pd.read_csv(filepath)
+
+    from demo import create_sample_dataset
+    print(f"Dataset not found at {filepath}, using the demo sample dataset")
+    return create_sample_dataset()
+
+def median_latency(fn, repeats):
+    """Median wall time of fn() in seconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+def benchmark_backend(backend, df, batch_size=10000, repeats=50):
+    """Fit one backend on a fixed split and measure it"""
+    classifier = MoodClassifier(backend=backend)
+    X, y = classifier.preprocess_data(df)
+    y_encoded = classifier.label_encoder.fit_transform(y)
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded
+    )
+    X_train_scaled = classifier.scaler.fit_transform(X_train)
+    X_test_scaled = classifier.scaler.transform(X_test)
+
+    start = time.perf_counter()
+    classifier.model.fit(X_train_scaled, y_train)
+    fit_time = time.perf_counter() - start
+    classifier.is_trained = True
+
+    accuracy = classifier.model.score(X_test_scaled, y_test)
+
+    # Single-row latency through the public API
+    row = X_test.iloc[0].to_dict()
+    single_latency = median_latency(lambda: classifier.predict_mood(row), repeats)
+
+    # Batch latency of the estimator itself on pre-scaled rows
+    reps = int(np.ceil(batch_size / len(X_test_scaled)))
+    batch = np.tile(X_test_scaled, (reps, 1))[:batch_size]
+    batch_latency = median_latency(lambda: classifier.model.predict_proba(batch), max(3, repeats // 10))
+
+    buffer = io.BytesIO()
+    joblib.dump(classifier.model, buffer)
+
+    return {
+        'backend': backend,
+        'estimator': type(classifier.model).__name__,
+        'fit_time_s': fit_time,
+        'single_row_latency_ms': single_latency * 1000,
+        'batch_latency_ms': batch_latency * 1000,
+        'batch_size': batch_size,
+        'batch_rows_per_s': batch_size / batch_latency,
+        'model_size_kb': buffer.getbuffer().nbytes / 1024,
+        'test_accuracy': accuracy
+    }
+
+def main():
+    """Run the backend comparison"""
+    parser = argparse.ArgumentParser(description="Benchmark MoodClassifier backends")
+    parser.add_argument('--data', default='data/mood_music_dataset.csv', help="Dataset CSV")
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), help="Backends to compare")
+    parser.add_argument('--batch-size', type=int, default=10000, help="Rows per batch prediction")
+    parser.add_argument('--repeats', type=int, default=50, help="Repetitions for latency medians")
+    parser.add_argument('--output', help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    df = load_dataset(args.data)
+
+    results = []
+    for backend in args.backends:
+        print(f"\n=== Benchmarking backend: {backend} ===")
+        results.append(benchmark_backend(backend, df, args.batch_size, args.repeats))
+
+    print("\n=== Backend Comparison ===")
+    print(pd.DataFrame(results).set_index('backend').round(4).to_string())
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
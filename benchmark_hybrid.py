@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark the hybrid ranker on a large candidate matrix
+Reports candidates per second for the full hybrid score and for each of its
+terms alone, on synthetic candidates scored with a saved model
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from demo import generate_synthetic_dataset
+from hybrid_ranker import HybridRanker
+from mood_classifier import MoodClassifier
+
+WEIGHT_SETS = {
+    'hybrid': None,
+    'probability only': {'probability': 1.0, 'target': 0.0, 'popularity': 0.0},
+    'target only': {'probability': 0.0, 'target': 1.0, 'popularity': 0.0},
+    'popularity only': {'probability': 0.0, 'target': 0.0, 'popularity': 1.0}
+}
+
+def main():
+    """Run the hybrid ranking benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark hybrid ranking throughput")
+    parser.add_argument('--model-dir', default='models', help="Saved model directory")
+    parser.add_argument('--candidates', type=int, default=100000, help="Candidates ranked per call")
+    parser.add_argument('--mood', default='Happy', help="Mood to rank for")
+    parser.add_argument('-k', type=int, default=50, help="Top candidates selected per call")
+    parser.add_argument('--repeats', type=int, default=5, help="Timed calls per configuration")
+    parser.add_argument('--fast', action='store_true', help="Use the distilled student model")
+    parser.add_argument('--output', help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    classifier = MoodClassifier()
+    if not classifier.load_model(args.model_dir):
+        print("Please run 'python train_model.py' first to train the model.")
+        return
+
+    df = generate_synthetic_dataset(args.candidates, with_metadata=False)
+    features = df[classifier.feature_columns].to_numpy(dtype=np.float64)
+    print(f"Ranking {args.candidates:,} candidates for {args.mood} (top {args.k}):")
+
+    results = {'candidates': args.candidates, 'k': args.k, 'mood': args.mood, 'runs': []}
+    for name, weights in WEIGHT_SETS.items():
+        ranker = HybridRanker(classifier, weights, fast=args.fast)
+        ranker.rank(features, args.mood, k=args.k)
+        timings = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            ranker.rank(features, args.mood, k=args.k)
+            timings.append(time.perf_counter() - start)
+        seconds = float(np.median(timings))
+        print(f"  {name:<18} {seconds * 1000:9.1f} ms   {args.candidates / seconds:12,.0f} candidates/s")
+        results['runs'].append({'weights': name, 'seconds': seconds,
+                                'candidates_per_second': args.candidates / seconds})
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
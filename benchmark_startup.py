@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the Moodify apps
+Measures, in fresh interpreter processes, how long importing each app module
+takes and how long loading the mood classifier takes, so startup changes can
+be compared reproducibly
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ['streamlit_app', 'kivy_app', 'model_loader', 'spotify_client', 'mood_classifier']
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+LOAD_SNIPPET = """
+import contextlib, io, time
+start = time.perf_counter()
+from mood_classifier import MoodClassifier
+classifier = MoodClassifier()
+with contextlib.redirect_stdout(io.StringIO()):
+    loaded = classifier.load_model({model_dir!r}, use_artifact={use_artifact})
+print(time.perf_counter() - start if loaded else 'failed')
+"""
+
+def time_snippet(code, runs):
+    """Run code in fresh interpreters; returns the per-run timings or an error message"""
+    timings = []
+    for _ in range(runs):
+        process = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+        output = process.stdout.strip().splitlines()
+        if process.returncode != 0 or not output or output[-1] == 'failed':
+            error = process.stderr.strip().splitlines()
+            return None, error[-1] if error else 'failed'
+        timings.append(float(output[-1]))
+    return timings, None
+
+def summarize(name, timings, error):
+    """Result record with median and min of the timings"""
+    if error is not None:
+        print(f"  {name:<28} unavailable ({error})")
+        return {'name': name, 'error': error}
+    median, best = statistics.median(timings), min(timings)
+    print(f"  {name:<28} median {median * 1000:8.1f} ms   min {best * 1000:8.1f} ms")
+    return {'name': name, 'median_s': median, 'min_s': best, 'runs': len(timings)}
+
+def top_imports(module, limit):
+    """Slowest imports (cumulative) of a module according to python -X importtime"""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True
+    )
+    rows = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+def main():
+    """Run the startup benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark Moodify cold-start time")
+    parser.add_argument('--modules', nargs='+', default=DEFAULT_MODULES, help="Modules to import")
+    parser.add_argument('--model-dir', default='models', help="Saved model directory")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh processes per measurement")
+    parser.add_argument('--importtime', type=int, metavar='N', default=0,
+                        help="Also list the N slowest imports of each module")
+    parser.add_argument('--output', help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    results = {'imports': [], 'model_load': []}
+
+    print("Module import time (fresh process):")
+    for module in args.modules:
+        timings, error = time_snippet(IMPORT_SNIPPET.format(module=module), args.runs)
+        results['imports'].append(summarize(module, timings, error))
+
+    print("\nModel load time (fresh process, including imports):")
+    for use_artifact in (True, False):
+        name = 'artifact (mmap)' if use_artifact else 'pickles'
+        if use_artifact and not os.path.exists(os.path.join(args.model_dir, 'mood_classifier.mfa')):
+            results['model_load'].append(summarize(name, None, 'no artifact saved'))
+            continue
+        code = LOAD_SNIPPET.format(model_dir=args.model_dir, use_artifact=use_artifact)
+        timings, error = time_snippet(code, args.runs)
+        results['model_load'].append(summarize(name, timings, error))
+
+    if args.importtime:
+        for module in args.modules:
+            print(f"\nSlowest imports of {module} (cumulative):")
+            for cumulative_us, name in top_imports(module, args.importtime):
+                print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
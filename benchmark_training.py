@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Training scalability benchmark for MoodClassifier
+Trains on synthetic datasets of increasing size (using the per-mood feature
+distributions from demo.py) and records fit time (the final model.fit) and
+full train() time, peak RSS, artifact size and predict throughput to a JSON
+results file
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+def peak_rss_mb():
+    """Peak resident set size of the current process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def directory_size(path):
+    """Total size in bytes of all files under path"""
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path)
+        for name in files
+    )
+
+def run_size(n_rows, backend, predict_rows, seed):
+    """Benchmark one dataset size; runs in a fresh child process"""
+    import numpy as np
+    from demo import generate_synthetic_dataset
+    from mood_classifier import MoodClassifier
+    from training_profiler import TrainingProfiler
+
+    df = generate_synthetic_dataset(n_rows, seed=seed, with_metadata=False)
+    data_rss = peak_rss_mb()
+
+    classifier = MoodClassifier(backend=backend)
+    # The profiler separates the final model.fit from the whole train() call,
+    # which also runs cross-validation and builds the reports
+    profiler = TrainingProfiler()
+    start = time.perf_counter()
+    # train() is chatty (reports, importances); keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        train_acc, test_acc = classifier.train(df, profiler=profiler)
+    train_time = time.perf_counter() - start
+    fit_time = next(p['wall_time_s'] for p in profiler.phases if p['phase'] == 'fit')
+    train_rss = peak_rss_mb()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        with contextlib.redirect_stdout(io.StringIO()):
+            classifier.save_model(model_dir)
+        artifact_bytes = directory_size(model_dir)
+
+    sample = df[classifier.feature_columns].iloc[:min(predict_rows, n_rows)]
+    start = time.perf_counter()
+    classifier.predict_mood(sample)
+    predict_time = time.perf_counter() - start
+
+    return {
+        'n_rows': n_rows,
+        'backend': backend,
+        'fit_time_s': fit_time,
+        'train_time_s': train_time,
+        'train_accuracy': float(train_acc),
+        'test_accuracy': float(test_acc),
+        'data_peak_rss_mb': data_rss,
+        'peak_rss_mb': train_rss,
+        'artifact_bytes': artifact_bytes,
+        'predict_rows': len(sample),
+        'predict_rows_per_s': len(sample) / predict_time if predict_time > 0 else float(np.inf)
+    }
+
+def git_revision():
+    """Short git revision of the working tree, if available"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment_info():
+    """Library and platform versions recorded alongside the results"""
+    import numpy
+    import pandas
+    import sklearn
+    return {
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': numpy.__version__,
+        'pandas': pandas.__version__,
+        'scikit-learn': sklearn.__version__
+    }
+
+def main():
+    """Run the scalability benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark MoodClassifier.train scaling")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Dataset sizes (rows) to benchmark")
+    parser.add_argument('--backend', default='rf', help="MoodClassifier backend")
+    parser.add_argument('--predict-rows', type=int, default=100_000,
+                        help="Rows used to measure predict throughput")
+    parser.add_argument('--seed', type=int, default=42, help="Synthetic data seed")
+    parser.add_argument('--output', default='training_benchmark.json',
+                        help="JSON results file")
+    args = parser.parse_args()
+
+    # A fresh spawned process per size keeps peak RSS measurements independent
+    context = multiprocessing.get_context('spawn')
+
+    results = []
+    for n_rows in args.sizes:
+        print(f"Benchmarking {n_rows:,} rows with backend '{args.backend}'...")
+        with context.Pool(1) as pool:
+            result = pool.apply(run_size, (n_rows, args.backend, args.predict_rows, args.seed))
+        results.append(result)
+        print(f"  fit {result['fit_time_s']:.2f}s (train {result['train_time_s']:.2f}s) | peak RSS {result['peak_rss_mb']:.0f} MB | "
+              f"artifact {result['artifact_bytes'] / 1024:.0f} KB | "
+              f"predict {result['predict_rows_per_s']:,.0f} rows/s | "
+              f"test accuracy {result['test_accuracy']:.3f}")
+
+    report = {
+        'benchmark': 'training_scalability',
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'environment': environment_info(),
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Bulk scoring of large track catalogs across a process pool
+Workers load the model once, either inherited copy-on-write from a forked
+parent or memory-mapped from the saved model artifact, and score row shards
+read from and written to shared memory, so results come back in input order
+without pickling the feature matrix
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# Set in the parent before forking, or by _init_worker in each worker
+_worker_classifier = None
+
+def _load_classifier(model_dir):
+    from mood_classifier import MoodClassifier
+    classifier = MoodClassifier()
+    with contextlib.redirect_stdout(io.StringIO()):
+        loaded = classifier.load_model(model_dir)
+    if not loaded:
+        raise ValueError(f"No trained model found in {model_dir}")
+    return classifier
+
+def _init_worker(model_dir):
+    global _worker_classifier
+    if _worker_classifier is None:
+        _worker_classifier = _load_classifier(model_dir)
+
+def _score_shard(task):
+    """Score rows [start, stop) of the shared input into the shared output"""
+    input_name, input_shape, input_dtype, output_name, output_shape, start, stop = task
+    input_shm = shared_memory.SharedMemory(name=input_name)
+    output_shm = shared_memory.SharedMemory(name=output_name)
+    try:
+        X = np.ndarray(input_shape, dtype=input_dtype, buffer=input_shm.buf)
+        probabilities = np.ndarray(output_shape, dtype=np.float64, buffer=output_shm.buf)
+        probabilities[start:stop] = _worker_classifier.predict_batch(X[start:stop])[2]
+        # Drop the views before closing, or close() fails on exported buffers
+        del X, probabilities
+    finally:
+        input_shm.close()
+        output_shm.close()
+    return stop - start
+
+class BulkScorer:
+    """Process pool that scores feature matrices with a shared read-only model
+
+    Forked workers inherit the parent's classifier (passed in or loaded from
+    model_dir) copy-on-write. Where fork is unavailable every worker loads
+    model_dir itself, which memory-maps the model artifact so the workers share
+    its pages. Use as a context manager, or call close() when done.
+    """
+    def __init__(self, classifier=None, model_dir='models', n_workers=None, shard_rows=65536):
+        global _worker_classifier
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.shard_rows = shard_rows
+
+        if classifier is None:
+            classifier = _load_classifier(model_dir)
+        self.classes = classifier.label_encoder.classes_
+        self.n_features = len(classifier.feature_columns)
+
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+            _worker_classifier = classifier
+        else:
+            context = multiprocessing.get_context('spawn')
+        # Workers must share the parent's tracker, or each one would report the
+        # shared memory it attaches to as leaked when it exits
+        resource_tracker.ensure_running()
+        try:
+            self._pool = context.Pool(self.n_workers, initializer=_init_worker, initargs=(model_dir,))
+        finally:
+            _worker_classifier = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def score(self, features):
+        """Score an (n_tracks, n_features) array in feature_columns order
+
+        float32 input is kept as float32 in shared memory. Returns NumPy arrays
+        (label_indices, confidences, probabilities) in input order, like
+        MoodClassifier.predict_batch.
+        """
+        X = np.asarray(features)
+        if X.dtype not in (np.float32, np.float64):
+            X = X.astype(np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected an array of shape (n_tracks, {self.n_features})")
+        output_shape = (len(X), len(self.classes))
+
+        input_shm = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+        output_shm = shared_memory.SharedMemory(create=True, size=max(8 * output_shape[0] * output_shape[1], 1))
+        try:
+            np.ndarray(X.shape, dtype=X.dtype, buffer=input_shm.buf)[:] = X
+            tasks = [
+                (input_shm.name, X.shape, X.dtype.str, output_shm.name, output_shape,
+                 start, min(start + self.shard_rows, len(X)))
+                for start in range(0, len(X), self.shard_rows)
+            ]
+            for _ in self._pool.imap_unordered(_score_shard, tasks):
+                pass
+            probabilities = np.ndarray(output_shape, dtype=np.float64, buffer=output_shm.buf).copy()
+        finally:
+            input_shm.close()
+            input_shm.unlink()
+            output_shm.close()
+            output_shm.unlink()
+
+        label_indices = np.argmax(probabilities, axis=1)
+        confidences = probabilities[np.arange(len(label_indices)), label_indices]
+        return label_indices, confidences, probabilities
+
+    def score_chunks(self, chunks):
+        """Score an iterable of feature arrays, yielding one result tuple per chunk in order"""
+        for chunk in chunks:
+            yield self.score(chunk)
+
+def bulk_score(features, classifier=None, model_dir='models', n_workers=None, shard_rows=65536):
+    """Score one feature matrix with a temporary BulkScorer"""
+    with BulkScorer(classifier, model_dir, n_workers, shard_rows) as scorer:
+        return scorer.score(features)
+
+def main():
+    """Measure bulk scoring throughput for several worker counts"""
+    parser = argparse.ArgumentParser(description="Benchmark process-pool bulk scoring")
+    parser.add_argument('--model-dir', default='models', help="Saved model directory")
+    parser.add_argument('--rows', type=int, default=1000000, help="Synthetic catalog size")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1],
+                        help="Worker counts to compare")
+    parser.add_argument('--shard-rows', type=int, default=65536, help="Rows per worker task")
+    args = parser.parse_args()
+
+    from demo import generate_synthetic_dataset
+
+    classifier = _load_classifier(args.model_dir)
+    X = generate_synthetic_dataset(args.rows, with_metadata=False)[classifier.feature_columns]
+    X = X.to_numpy(dtype=np.float32)
+
+    print(f"Scoring {args.rows:,} rows ({os.cpu_count()} CPUs)")
+    baseline = None
+    reference = None
+    for n_workers in sorted(set(args.workers)):
+        with BulkScorer(classifier, args.model_dir, n_workers, args.shard_rows) as scorer:
+            start = time.perf_counter()
+            label_indices, _, _ = scorer.score(X)
+            elapsed = time.perf_counter() - start
+        if reference is None:
+            reference = label_indices
+        baseline = baseline or elapsed
+        consistent = 'ok' if np.array_equal(label_indices, reference) else 'MISMATCH'
+        print(f"  {n_workers:>3} workers: {elapsed:8.2f} s  {args.rows / elapsed:12,.0f} rows/s  "
+              f"speedup {baseline / elapsed:5.2f}x  {consistent}")
+
+if __name__ == "__main__":
+    main()
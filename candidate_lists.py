@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Precomputed ranked candidate lists per mood
+Scores a whole catalog with the trained MoodClassifier once, offline, and
+writes each mood's best-matching tracks (ID, mood probability, features and
+display info) to a memory-mappable file the apps serve recommendations from
+without running the model or calling the Spotify API
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+import model_artifact
+
+CANDIDATES_MAGIC = b'MOODCAND'
+CANDIDATES_FILENAME = 'mood_candidates.bin'
+
+# Track info key -> catalog column, stored so serving needs no track lookups
+INFO_COLUMNS = {
+    'name': 'track_name',
+    'artist': 'artist',
+    'album': 'album',
+    'image_url': 'image_url',
+    'preview_url': 'preview_url'
+}
+
+def _encode(values):
+    """Fixed-width UTF-8 bytes for a string column; missing values become b''"""
+    return np.array([b'' if value is None or value != value else str(value).encode('utf-8')
+                     for value in values], dtype=np.bytes_)
+
+def build_candidate_lists(catalog_path, classifier, output_path, per_mood=5000, chunksize=100000):
+    """Score catalog_path and write the top per_mood tracks of every mood to output_path
+
+    The catalog is streamed in chunks and only the running top per_mood rows of
+    each mood are kept, so memory stays bounded for any catalog size. The
+    catalog's display columns (INFO_COLUMNS) are stored with each track.
+    """
+    from score_catalog import read_chunks, read_column_names
+
+    feature_columns = classifier.feature_columns
+    available = set(read_column_names(catalog_path))
+    info_columns = {key: column for key, column in INFO_COLUMNS.items() if column in available}
+    moods = [str(mood) for mood in classifier.label_encoder.classes_]
+    best = {mood: None for mood in moods}
+    n_rows = 0
+    for chunk in read_chunks(catalog_path, ['track_id'] + feature_columns + list(info_columns.values()),
+                             chunksize):
+        chunk = chunk.dropna(subset=['track_id'])
+        features = chunk[feature_columns].to_numpy(dtype=np.float64)
+        _, _, probabilities = classifier.predict_batch(features)
+        n_rows += len(chunk)
+        columns = {'track_ids': _encode(chunk['track_id']), 'features': features}
+        columns.update({key: _encode(chunk[column]) for key, column in info_columns.items()})
+        for i, mood in enumerate(moods):
+            ranked = dict(columns, probabilities=probabilities[:, i])
+            if best[mood] is not None:
+                ranked = {name: np.concatenate([best[mood][name], array]) for name, array in ranked.items()}
+            if len(ranked['probabilities']) > per_mood:
+                top = np.argpartition(-ranked['probabilities'], per_mood - 1)[:per_mood]
+                ranked = {name: array[top] for name, array in ranked.items()}
+            best[mood] = ranked
+
+    arrays = {}
+    for mood, ranked in best.items():
+        if ranked is None:
+            ranked = {name: np.empty(0, dtype=np.bytes_) for name in ['track_ids'] + list(info_columns)}
+            ranked.update(probabilities=np.empty(0), features=np.empty((0, len(feature_columns))))
+        # Stable sort on the negated score: highest probability first, ties in catalog order
+        order = np.argsort(-ranked['probabilities'], kind='stable')
+        for name, array in ranked.items():
+            array = array[order]
+            arrays[f'{mood}/{name}'] = array if array.dtype.kind == 'S' else array.astype('<f4')
+
+    model_artifact.save_blocks(output_path, arrays, {
+        'moods': moods,
+        'feature_columns': feature_columns,
+        'info_columns': list(info_columns),
+        'model_version': classifier.model_version,
+        'catalog_rows': n_rows
+    }, magic=CANDIDATES_MAGIC)
+    return n_rows
+
+class CandidateLists:
+    """Memory-mapped per-mood candidate lists written by build_candidate_lists
+
+    With model_version, lists built by any other model are rejected with a
+    ValueError, since their ranking no longer matches the model in use.
+    """
+    def __init__(self, path, model_version=None):
+        self.arrays, self.header = model_artifact.load_blocks(path, magic=CANDIDATES_MAGIC)
+        if model_version is not None and self.header.get('model_version') != model_version:
+            raise ValueError(f"{path} was built by model {self.header.get('model_version')}, not the "
+                             f"current model {model_version}; rebuild it with 'python candidate_lists.py'")
+        self.moods = self.header['moods']
+        self.feature_columns = self.header['feature_columns']
+        self.info_columns = self.header.get('info_columns', [])
+
+    def __len__(self):
+        return sum(len(self.arrays[f'{mood}/track_ids']) for mood in self.moods)
+
+    def _sample_rows(self, mood, n, window, rng):
+        if mood not in self.moods:
+            raise ValueError(f"Unknown mood: {mood}")
+        rng = rng or np.random.default_rng()
+        window = min(window, len(self.arrays[f'{mood}/track_ids']))
+        return rng.choice(window, size=min(n, window), replace=False)
+
+    def sample(self, mood, n=20, window=200, rng=None):
+        """n tracks drawn without replacement from the mood's top window, in shuffled order
+
+        Returns (track_ids, probabilities, features); only the sampled rows are
+        read from the mapped file.
+        """
+        rows = self._sample_rows(mood, n, window, rng)
+        return (
+            [track_id.decode() for track_id in self.arrays[f'{mood}/track_ids'][rows]],
+            np.asarray(self.arrays[f'{mood}/probabilities'][rows], dtype=np.float64),
+            np.asarray(self.arrays[f'{mood}/features'][rows], dtype=np.float64)
+        )
+
+    def sample_tracks(self, mood, n=20, window=200, rng=None):
+        """Like sample, as track dicts ready for display
+
+        Each dict has track_id, mood_probability, one key per feature and the
+        stored track info in SpotifyClient.get_track_info's format (id, name,
+        artist, album, image_url, preview_url, popularity), with None for
+        values the catalog did not have.
+        """
+        rows = self._sample_rows(mood, n, window, rng)
+        track_ids = [track_id.decode() for track_id in self.arrays[f'{mood}/track_ids'][rows]]
+        probabilities = self.arrays[f'{mood}/probabilities'][rows].tolist()
+        features = self.arrays[f'{mood}/features'][rows].tolist()
+        info = {key: [value.decode('utf-8') or None for value in self.arrays[f'{mood}/{key}'][rows]]
+                for key in self.info_columns}
+
+        tracks = []
+        for i, track_id in enumerate(track_ids):
+            track = dict(zip(self.feature_columns, features[i]), id=track_id, track_id=track_id,
+                         mood_probability=probabilities[i])
+            track.update({key: values[i] for key, values in info.items()})
+            if 'popularity' in track:
+                track['popularity'] = int(round(track['popularity']))
+            tracks.append(track)
+        return tracks
+
+def main():
+    """Build the candidate lists from a catalog file"""
+    from mood_classifier import MoodClassifier
+
+    parser = argparse.ArgumentParser(description="Precompute ranked candidate lists per mood")
+    parser.add_argument('--catalog', default='data/mood_music_dataset.csv',
+                        help="CSV or Parquet catalog with track_id and the model's feature columns")
+    parser.add_argument('--model-dir', default='models', help="Saved model directory")
+    parser.add_argument('--output', help=f"Output file (default: <model-dir>/{CANDIDATES_FILENAME})")
+    parser.add_argument('--per-mood', type=int, default=5000, help="Candidates kept per mood")
+    parser.add_argument('--chunksize', type=int, default=100000, help="Catalog rows scored at a time")
+    args = parser.parse_args()
+
+    classifier = MoodClassifier()
+    if not classifier.load_model(args.model_dir):
+        print("Please run 'python train_model.py' first to train the model.")
+        return
+
+    output = args.output or os.path.join(args.model_dir, CANDIDATES_FILENAME)
+    start = time.perf_counter()
+    n_rows = build_candidate_lists(args.catalog, classifier, output, args.per_mood, args.chunksize)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {n_rows:,} tracks in {elapsed:.2f}s; candidate lists written to {output} "
+          f"({os.path.getsize(output) / 1024:.1f} KB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# The tests import the top-level modules of the repository root, which pytest
+# puts on sys.path because this conftest.py lives there
@@ -2,6 +2,7 @@ import pandas as pd
 import time
 import random
 from spotify_client import SpotifyClient
+from track_catalog import TrackCatalog
 import os
 
 class MoodDataCollector:
@@ -188,8 +189,8 @@ class MoodDataCollector:
         
         return all_data
     
-    def save_data(self, data, filename='mood_music_dataset.csv'):
-        """Save collected data to CSV"""
+    def save_data(self, data, filename='mood_music_dataset.csv', catalog_path='data/track_catalog.db'):
+        """Save collected data to CSV and upsert it into the track catalog (unless catalog_path is None)"""
         df = pd.DataFrame(data)
         
         # Remove duplicates based on track_id
@@ -200,6 +201,10 @@ class MoodDataCollector:
         df.to_csv(filepath, index=False)
         
         print(f"\nDataset saved to {filepath}")
+        if catalog_path:
+            with TrackCatalog(catalog_path) as catalog:
+                catalog.upsert(df)
+            print(f"Track catalog updated: {catalog_path}")
         print(f"Total tracks: {len(df)}")
         print(f"Mood distribution:")
         print(df['mood'].value_counts())
@@ -9,135 +9,90 @@ import numpy as np
 from mood_classifier import MoodClassifier
 import os
 
+# Per-mood feature distributions: (low, high) ranges, sampled uniformly
+# (integers for popularity and duration_ms, floats otherwise)
+MOOD_FEATURE_RANGES = {
+    'Happy': {
+        'popularity': (60, 100), 'danceability': (0.6, 0.9), 'energy': (0.6, 0.9),
+        'loudness': (-8, -3), 'speechiness': (0.03, 0.15), 'acousticness': (0.1, 0.4),
+        'instrumentalness': (0.0, 0.1), 'liveness': (0.05, 0.25), 'valence': (0.7, 0.95),
+        'tempo': (110, 140), 'duration_ms': (180000, 240000)
+    },
+    'Sad': {
+        'popularity': (40, 80), 'danceability': (0.2, 0.5), 'energy': (0.2, 0.5),
+        'loudness': (-15, -8), 'speechiness': (0.03, 0.1), 'acousticness': (0.4, 0.8),
+        'instrumentalness': (0.0, 0.3), 'liveness': (0.05, 0.2), 'valence': (0.1, 0.4),
+        'tempo': (60, 90), 'duration_ms': (200000, 300000)
+    },
+    'Angry': {
+        'popularity': (50, 85), 'danceability': (0.3, 0.7), 'energy': (0.8, 0.98),
+        'loudness': (-5, -1), 'speechiness': (0.05, 0.3), 'acousticness': (0.0, 0.2),
+        'instrumentalness': (0.0, 0.4), 'liveness': (0.1, 0.4), 'valence': (0.2, 0.5),
+        'tempo': (120, 180), 'duration_ms': (180000, 250000)
+    },
+    'Calm': {
+        'popularity': (30, 70), 'danceability': (0.2, 0.5), 'energy': (0.1, 0.4),
+        'loudness': (-20, -10), 'speechiness': (0.03, 0.08), 'acousticness': (0.5, 0.95),
+        'instrumentalness': (0.2, 0.8), 'liveness': (0.05, 0.15), 'valence': (0.3, 0.7),
+        'tempo': (50, 80), 'duration_ms': (240000, 360000)
+    },
+    'Energetic': {
+        'popularity': (60, 95), 'danceability': (0.7, 0.95), 'energy': (0.8, 0.98),
+        'loudness': (-6, -2), 'speechiness': (0.03, 0.2), 'acousticness': (0.0, 0.3),
+        'instrumentalness': (0.0, 0.2), 'liveness': (0.1, 0.3), 'valence': (0.6, 0.9),
+        'tempo': (120, 160), 'duration_ms': (180000, 240000)
+    }
+}
+
+INTEGER_FEATURES = ('popularity', 'duration_ms')
+
+def generate_mood_tracks(mood, n_tracks, rng=np.random, with_metadata=True):
+    """Generate n_tracks synthetic tracks for one mood as a DataFrame"""
+    data = {'mood': np.full(n_tracks, mood, dtype=object)}
+    if with_metadata:
+        prefix = mood.lower()
+        index = np.arange(n_tracks)
+        data['track_id'] = [f'{prefix}_{i}' for i in index]
+        data['track_name'] = [f'{mood} Song {i+1}' for i in index]
+        data['artist'] = [f'{mood} Artist {i+1}' for i in index]
+        data['album'] = [f'{mood} Album {i+1}' for i in index]
+    for feature, (low, high) in MOOD_FEATURE_RANGES[mood].items():
+        if feature in INTEGER_FEATURES:
+            data[feature] = rng.randint(low, high, size=n_tracks)
+        else:
+            data[feature] = rng.uniform(low, high, size=n_tracks)
+    if with_metadata:
+        data['time_signature'] = 4
+        data['preview_url'] = None
+        data['image_url'] = None
+    return pd.DataFrame(data)
+
+def generate_synthetic_dataset(n_rows, seed=42, with_metadata=True):
+    """Generate a shuffled synthetic dataset of n_rows tracks split evenly across moods
+    
+    with_metadata=False keeps only the mood and audio feature columns, which is
+    much cheaper for multi-million row benchmark datasets.
+    """
+    rng = np.random.RandomState(seed)
+    moods = list(MOOD_FEATURE_RANGES)
+    counts = [n_rows // len(moods) + (i < n_rows % len(moods)) for i in range(len(moods))]
+    df = pd.concat(
+        [generate_mood_tracks(mood, count, rng, with_metadata) for mood, count in zip(moods, counts)],
+        ignore_index=True
+    )
+    return df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+
 def create_sample_dataset():
     """Create a sample dataset for demonstration"""
     print("🎵 Creating sample music dataset...")
     
-    # Sample data with different mood characteristics
-    sample_data = []
-    
-    # Happy songs characteristics
-    for i in range(50):
-        sample_data.append({
-            'mood': 'Happy',
-            'track_id': f'happy_{i}',
-            'track_name': f'Happy Song {i+1}',
-            'artist': f'Happy Artist {i+1}',
-            'album': f'Happy Album {i+1}',
-            'popularity': np.random.randint(60, 100),
-            'danceability': np.random.uniform(0.6, 0.9),
-            'energy': np.random.uniform(0.6, 0.9),
-            'loudness': np.random.uniform(-8, -3),
-            'speechiness': np.random.uniform(0.03, 0.15),
-            'acousticness': np.random.uniform(0.1, 0.4),
-            'instrumentalness': np.random.uniform(0.0, 0.1),
-            'liveness': np.random.uniform(0.05, 0.25),
-            'valence': np.random.uniform(0.7, 0.95),
-            'tempo': np.random.uniform(110, 140),
-            'duration_ms': np.random.randint(180000, 240000),
-            'time_signature': 4,
-            'preview_url': None,
-            'image_url': None
-        })
-    
-    # Sad songs characteristics
-    for i in range(50):
-        sample_data.append({
-            'mood': 'Sad',
-            'track_id': f'sad_{i}',
-            'track_name': f'Sad Song {i+1}',
-            'artist': f'Sad Artist {i+1}',
-            'album': f'Sad Album {i+1}',
-            'popularity': np.random.randint(40, 80),
-            'danceability': np.random.uniform(0.2, 0.5),
-            'energy': np.random.uniform(0.2, 0.5),
-            'loudness': np.random.uniform(-15, -8),
-            'speechiness': np.random.uniform(0.03, 0.1),
-            'acousticness': np.random.uniform(0.4, 0.8),
-            'instrumentalness': np.random.uniform(0.0, 0.3),
-            'liveness': np.random.uniform(0.05, 0.2),
-            'valence': np.random.uniform(0.1, 0.4),
-            'tempo': np.random.uniform(60, 90),
-            'duration_ms': np.random.randint(200000, 300000),
-            'time_signature': 4,
-            'preview_url': None,
-            'image_url': None
-        })
-    
-    # Angry songs characteristics
-    for i in range(50):
-        sample_data.append({
-            'mood': 'Angry',
-            'track_id': f'angry_{i}',
-            'track_name': f'Angry Song {i+1}',
-            'artist': f'Angry Artist {i+1}',
-            'album': f'Angry Album {i+1}',
-            'popularity': np.random.randint(50, 85),
-            'danceability': np.random.uniform(0.3, 0.7),
-            'energy': np.random.uniform(0.8, 0.98),
-            'loudness': np.random.uniform(-5, -1),
-            'speechiness': np.random.uniform(0.05, 0.3),
-            'acousticness': np.random.uniform(0.0, 0.2),
-            'instrumentalness': np.random.uniform(0.0, 0.4),
-            'liveness': np.random.uniform(0.1, 0.4),
-            'valence': np.random.uniform(0.2, 0.5),
-            'tempo': np.random.uniform(120, 180),
-            'duration_ms': np.random.randint(180000, 250000),
-            'time_signature': 4,
-            'preview_url': None,
-            'image_url': None
-        })
-    
-    # Calm songs characteristics
-    for i in range(50):
-        sample_data.append({
-            'mood': 'Calm',
-            'track_id': f'calm_{i}',
-            'track_name': f'Calm Song {i+1}',
-            'artist': f'Calm Artist {i+1}',
-            'album': f'Calm Album {i+1}',
-            'popularity': np.random.randint(30, 70),
-            'danceability': np.random.uniform(0.2, 0.5),
-            'energy': np.random.uniform(0.1, 0.4),
-            'loudness': np.random.uniform(-20, -10),
-            'speechiness': np.random.uniform(0.03, 0.08),
-            'acousticness': np.random.uniform(0.5, 0.95),
-            'instrumentalness': np.random.uniform(0.2, 0.8),
-            'liveness': np.random.uniform(0.05, 0.15),
-            'valence': np.random.uniform(0.3, 0.7),
-            'tempo': np.random.uniform(50, 80),
-            'duration_ms': np.random.randint(240000, 360000),
-            'time_signature': 4,
-            'preview_url': None,
-            'image_url': None
-        })
-    
-    # Energetic songs characteristics
-    for i in range(50):
-        sample_data.append({
-            'mood': 'Energetic',
-            'track_id': f'energetic_{i}',
-            'track_name': f'Energetic Song {i+1}',
-            'artist': f'Energetic Artist {i+1}',
-            'album': f'Energetic Album {i+1}',
-            'popularity': np.random.randint(60, 95),
-            'danceability': np.random.uniform(0.7, 0.95),
-            'energy': np.random.uniform(0.8, 0.98),
-            'loudness': np.random.uniform(-6, -2),
-            'speechiness': np.random.uniform(0.03, 0.2),
-            'acousticness': np.random.uniform(0.0, 0.3),
-            'instrumentalness': np.random.uniform(0.0, 0.2),
-            'liveness': np.random.uniform(0.1, 0.3),
-            'valence': np.random.uniform(0.6, 0.9),
-            'tempo': np.random.uniform(120, 160),
-            'duration_ms': np.random.randint(180000, 240000),
-            'time_signature': 4,
-            'preview_url': None,
-            'image_url': None
-        })
+    # 50 tracks per mood with the characteristics above
+    df = pd.concat(
+        [generate_mood_tracks(mood, 50) for mood in MOOD_FEATURE_RANGES],
+        ignore_index=True
+    )
     
-    # Create DataFrame and save
-    df = pd.DataFrame(sample_data)
+    # Save the dataset
     os.makedirs('data', exist_ok=True)
     df.to_csv('data/mood_music_dataset.csv', index=False)
     
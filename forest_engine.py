@@ -0,0 +1,173 @@
+import numpy as np
+
+def _ordered_keys(x):
+    """Map float64 values to int64 keys with the same ordering"""
+    bits = np.ascontiguousarray(x, dtype=np.float64).view(np.int64)
+    return bits ^ ((bits >> 63) & np.int64(0x7FFFFFFFFFFFFFFF))
+
+def _from_ordered_keys(keys):
+    """Inverse of _ordered_keys"""
+    keys = np.ascontiguousarray(keys, dtype=np.int64)
+    return (keys ^ ((keys >> 63) & np.int64(0x7FFFFFFFFFFFFFFF))).view(np.float64)
+
+def _fold_thresholds(threshold, mean, scale):
+    """Move split thresholds from scaled space into raw feature space, exactly
+
+    sklearn trees compare float32(x_scaled) <= threshold, where
+    x_scaled = (x - mean) / scale is computed in float64. That mapping is
+    monotonic in x, so for every threshold there is a largest raw value x*
+    that still goes left, and x <= x* gives identical decisions. x* is found
+    by a vectorized binary search over the ordered float64 bit patterns.
+    """
+    def goes_left(x):
+        scaled = ((x - mean) / scale).astype(np.float32).astype(np.float64)
+        return scaled <= threshold
+
+    guess = threshold * scale + mean
+    delta = (np.abs(threshold) + 1.0) * scale * 1e-6
+    lo, hi = guess - delta, guess + delta
+    # Widen the bracket until lo goes left and hi goes right for every node
+    while True:
+        bad_lo, bad_hi = ~goes_left(lo), goes_left(hi)
+        if not (bad_lo.any() or bad_hi.any()):
+            break
+        delta = delta * 2
+        lo = np.where(bad_lo, guess - delta, lo)
+        hi = np.where(bad_hi, guess + delta, hi)
+
+    lo_key, hi_key = _ordered_keys(lo), _ordered_keys(hi)
+    while True:
+        open_ = hi_key - lo_key > 1
+        if not open_.any():
+            break
+        mid_key = lo_key + (hi_key - lo_key) // 2
+        left = goes_left(_from_ordered_keys(mid_key))
+        lo_key = np.where(open_ & left, mid_key, lo_key)
+        hi_key = np.where(open_ & ~left, mid_key, hi_key)
+    return _from_ordered_keys(lo_key)
+
+class FlatForest:
+    """Tree ensemble flattened into contiguous node arrays for vectorized inference
+
+    All trees share one set of node arrays (feature, threshold, left, right,
+    values); roots holds the index of each tree's root node and children the
+    interleaved (left, right) pairs traversal steps through. Leaves point to
+    themselves, so a fixed number of traversal steps evaluates every tree for
+    a whole batch at once. When built with a fitted StandardScaler the scaling
+    is folded into the thresholds and predict_proba takes raw features.
+    Probabilities are bit-identical to the sklearn estimator's predict_proba.
+    """
+    # Rows evaluated per block, bounds the (n_trees, rows, n_classes) leaf gather
+    block_size = 4096
+
+    def __init__(self, feature, threshold, left, right, values, roots, max_depth, children=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        if children is None:
+            # children[2 * node + goes_right] is the next node
+            children = np.column_stack([self.left, self.right]).ravel()
+        self.children = np.ascontiguousarray(children, dtype=np.intp)
+
+    @staticmethod
+    def supports(estimator):
+        """Whether the estimator is a decision tree or a forest of decision trees"""
+        trees = getattr(estimator, 'estimators_', [estimator])
+        return len(trees) > 0 and all(hasattr(tree, 'tree_') for tree in trees)
+
+    @classmethod
+    def from_estimator(cls, estimator, scaler=None):
+        """Flatten a fitted tree classifier or forest, folding in a fitted scaler"""
+        if not cls.supports(estimator):
+            raise ValueError(f"{type(estimator).__name__} is not a decision tree ensemble")
+        trees = [tree.tree_ for tree in getattr(estimator, 'estimators_', [estimator])]
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left < 0
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+
+            # scikit-learn 1.4+ stores class fractions, which predict_proba
+            # returns as they are (renormalizing can change the last bit);
+            # older versions store weighted counts, which predict_proba divides
+            # by their sum, so do the same when the tree holds counts
+            value = tree.value[:, 0, :estimator.n_classes_].copy()
+            totals = value.sum(axis=1, keepdims=True)
+            if not np.allclose(totals, 1.0):
+                totals[totals == 0.0] = 1.0
+                value /= totals
+            values.append(value)
+            offset += tree.node_count
+
+        feature = np.concatenate(features)
+        threshold = np.concatenate(thresholds)
+        if scaler is not None:
+            internal = np.isfinite(threshold)
+            threshold[internal] = _fold_thresholds(
+                threshold[internal],
+                scaler.mean_[feature[internal]],
+                scaler.scale_[feature[internal]]
+            )
+
+        return cls(
+            feature, threshold, np.concatenate(lefts), np.concatenate(rights),
+            np.concatenate(values), roots, max(tree.max_depth for tree in trees)
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_classes(self):
+        return self.values.shape[1]
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def apply(self, X):
+        """Leaf node index reached in every tree, shape (n_trees, n_rows)
+
+        Each of max_depth steps touches one node per tree and row, so the cost
+        scales with depth x trees x rows and not with the size of the forest.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        n_rows, n_features = X.shape
+
+        # Gather from the flattened matrix: row offset plus feature index
+        flat_X = X.ravel()
+        row_offsets = np.arange(n_rows) * n_features
+        node = np.repeat(self.roots[:, np.newaxis], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            goes_right = flat_X[self.feature[node] + row_offsets] > self.threshold[node]
+            node = self.children[node * 2 + goes_right]
+        return node
+
+    def predict_proba(self, X):
+        """Class probabilities averaged over trees, shape (n_rows, n_classes)"""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if len(X) > self.block_size:
+            return np.concatenate([
+                self.predict_proba(X[start:start + self.block_size])
+                for start in range(0, len(X), self.block_size)
+            ])
+        leaves = self.apply(X)
+        # Summing over the leading axis adds trees in order, as sklearn does
+        proba = self.values[leaves].sum(axis=0)
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        """Index of the most probable class for each row"""
+        return np.argmax(self.predict_proba(X), axis=1)
@@ -0,0 +1,79 @@
+import numpy as np
+
+from mood_profiles import mood_characteristics
+
+DEFAULT_WEIGHTS = {'probability': 0.6, 'target': 0.3, 'popularity': 0.1}
+
+class HybridRanker:
+    """Ranks candidate tracks for a mood by classifier, target profile and popularity
+
+    The score of each candidate is a weighted sum of three terms in [0, 1]:
+    - probability: the MoodClassifier's probability of the mood
+    - target: exp(-d^2 / 2n) for the distance d to the mood's characteristic
+      features (mood_characteristics), in units of the scaler's per-feature
+      standard deviation over n features
+    - popularity: Spotify popularity / 100
+    Weights are normalized to sum to one; a zero weight skips its term.
+    """
+    def __init__(self, classifier, weights=None, fast=False):
+        self.classifier = classifier
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.fast = fast
+        columns = classifier.feature_columns
+        self._popularity_column = columns.index('popularity') if 'popularity' in columns else None
+
+        # Per mood: the feature columns its target covers, their target values
+        # and scales
+        self._targets = {}
+        for mood, target in mood_characteristics(classifier.mood_profiles).items():
+            indices = [columns.index(feature) for feature in target if feature in columns]
+            self._targets[mood] = (
+                np.array(indices),
+                np.array([target[columns[i]] for i in indices], dtype=np.float64),
+                classifier.scaler.scale_[indices]
+            )
+        self._mood_index = {str(mood): i for i, mood in enumerate(classifier.label_encoder.classes_)}
+
+    def score(self, features, mood, popularity=None):
+        """Hybrid score of each row of an (n_tracks, n_features) array in feature_columns order
+
+        popularity (0-100 per track) overrides the popularity feature column.
+        Missing values are treated as the scaler's training mean.
+        """
+        if mood not in self._mood_index:
+            raise ValueError(f"Unknown mood: {mood}")
+        features = np.asarray(features, dtype=np.float64)
+        total = sum(self.weights.values())
+        scores = np.zeros(len(features))
+
+        if self.weights['probability']:
+            _, _, probabilities = self.classifier.predict_batch(features, fast=self.fast)
+            scores += self.weights['probability'] / total * probabilities[:, self._mood_index[mood]]
+
+        if self.weights['target'] and mood in self._targets:
+            indices, target, scale = self._targets[mood]
+            values = features[:, indices]
+            values = np.where(np.isnan(values), self.classifier.scaler.mean_[indices], values)
+            squared = (((values - target) / scale) ** 2).sum(axis=1)
+            scores += self.weights['target'] / total * np.exp(-squared / (2 * len(indices)))
+
+        if self.weights['popularity']:
+            if popularity is None and self._popularity_column is not None:
+                popularity = features[:, self._popularity_column]
+            if popularity is not None:
+                popularity = np.nan_to_num(np.asarray(popularity, dtype=np.float64), nan=0.0)
+                scores += self.weights['popularity'] / total * np.clip(popularity / 100.0, 0.0, 1.0)
+        return scores
+
+    def rank(self, features, mood, popularity=None, k=None):
+        """Candidate row indices ordered best first, with their scores
+
+        With k, only the top k are selected (argpartition) and sorted.
+        """
+        scores = self.score(features, mood, popularity)
+        if k is not None and k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+            order = top[np.argsort(-scores[top], kind='stable')]
+        else:
+            order = np.argsort(-scores, kind='stable')
+        return order, scores[order]
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Moodify local inference server
+Owns one loaded MoodClassifier and serves many front-end processes, grouping
+concurrent requests into micro-batches for MoodClassifier.predict_batch
+
+Endpoints:
+  POST /predict   body: a feature dict, a list of them, or {"tracks": [...]}
+  GET  /metrics   queue, batch and latency metrics
+  GET  /health
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import socket
+import time
+import urllib.request
+from collections import deque
+
+import numpy as np
+
+class MicroBatcher:
+    """Collects concurrent prediction requests into batches
+
+    Every request already queued when a batch is formed joins it, up to
+    max_batch_size rows, so requests that arrive while a batch is predicting
+    go out together in the next one. Only when the queue runs empty does the
+    batcher wait for more, until the oldest request has waited max_wait_ms.
+    """
+    def __init__(self, classifier, max_batch_size=256, max_wait_ms=5.0, latency_window=1000):
+        self.classifier = classifier
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.latencies = deque(maxlen=latency_window)
+        self.batch_sizes = deque(maxlen=latency_window)
+        self._worker = None
+
+    def start(self):
+        """Start the batching loop on the running event loop"""
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the batching loop; requests not answered yet fail with a RuntimeError"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        queued = []
+        while not self.queue.empty():
+            queued.append(self.queue.get_nowait())
+        self._fail(queued, RuntimeError("Inference server is shutting down"))
+
+    async def submit(self, rows):
+        """Queue an (n, n_features) array and wait for (labels, confidences, probabilities)"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((rows, future, time.perf_counter()))
+        return await future
+
+    @staticmethod
+    def _fail(pending, error):
+        """Set error on the futures of pending requests that have no result yet"""
+        for _, future, _ in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    def _drain(self, pending, n_rows):
+        """Move requests already in the queue into pending, up to the batch limit"""
+        while n_rows < self.max_batch_size:
+            try:
+                item = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            pending.append(item)
+            n_rows += len(item[0])
+        return n_rows
+
+    async def _run(self):
+        pending = []
+        try:
+            await self._batch_loop(pending)
+        except asyncio.CancelledError:
+            # Requests taken off the queue for the interrupted batch
+            self._fail(pending, RuntimeError("Inference server is shutting down"))
+            raise
+
+    async def _batch_loop(self, pending):
+        """Form and predict batches forever; pending holds the current batch's requests"""
+        loop = asyncio.get_running_loop()
+        while True:
+            pending.clear()
+            pending.append(await self.queue.get())
+            n_rows = self._drain(pending, len(pending[0][0]))
+            deadline = pending[0][2] + self.max_wait
+
+            # The queue is empty here; wait for stragglers until the deadline
+            while n_rows < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                n_rows = self._drain(pending, n_rows + len(item[0]))
+
+            batch = np.concatenate([rows for rows, _, _ in pending])
+            try:
+                # Prediction releases the event loop so new requests keep queuing
+                labels, confidences, probabilities = await loop.run_in_executor(
+                    None, self.classifier.predict_batch, batch
+                )
+            except Exception as e:
+                self._fail(pending, e)
+                continue
+
+            self.batches += 1
+            self.batch_sizes.append(len(batch))
+            done = time.perf_counter()
+            start = 0
+            for rows, future, enqueued in pending:
+                end = start + len(rows)
+                if not future.done():
+                    future.set_result((labels[start:end], confidences[start:end], probabilities[start:end]))
+                self.requests += 1
+                self.rows += len(rows)
+                self.latencies.append(done - enqueued)
+                start = end
+
+    def metrics(self):
+        """Queue, throughput and latency metrics"""
+        latencies = np.array(self.latencies) * 1000
+        return {
+            'queue_depth': self.queue.qsize(),
+            'requests': self.requests,
+            'rows': self.rows,
+            'batches': self.batches,
+            'mean_batch_size': float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'latency_ms_p50': float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+            'latency_ms_p95': float(np.percentile(latencies, 95)) if len(latencies) else 0.0,
+            'latency_ms_p99': float(np.percentile(latencies, 99)) if len(latencies) else 0.0
+        }
+
+class InferenceServer:
+    """Minimal HTTP/1.1 front end for a MicroBatcher, over TCP or a Unix socket"""
+    def __init__(self, classifier, max_batch_size=256, max_wait_ms=5.0):
+        self.classifier = classifier
+        self.batcher = MicroBatcher(classifier, max_batch_size, max_wait_ms)
+
+    def _rows_from_tracks(self, tracks):
+        """Feature matrix for a list of feature dicts; missing features become NaN"""
+        columns = self.classifier.feature_columns
+        return np.array(
+            [[track.get(column, np.nan) for column in columns] for track in tracks],
+            dtype=np.float64
+        ).reshape(len(tracks), len(columns))
+
+    async def _predict(self, payload):
+        tracks = payload.get('tracks', [payload]) if isinstance(payload, dict) else payload
+        if not tracks:
+            return []
+        labels, confidences, probabilities = await self.batcher.submit(self._rows_from_tracks(tracks))
+        classes = [str(mood) for mood in self.classifier.label_encoder.classes_]
+        return [
+            {
+                'predicted_mood': classes[label],
+                'confidence': float(confidence),
+                'all_probabilities': dict(zip(classes, map(float, proba)))
+            }
+            for label, confidence, proba in zip(labels, confidences, probabilities)
+        ]
+
+    async def _respond(self, writer, status, body, keep_alive):
+        payload = json.dumps(body).encode()
+        reason = http.client.responses.get(status, '')
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + payload
+        )
+        await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP requests on one connection until the client closes it"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                keep_alive = headers.get('connection', '').lower() != 'close'
+
+                if method == 'POST' and path == '/predict':
+                    try:
+                        results = await self._predict(json.loads(body or b'null'))
+                        await self._respond(writer, 200, {'results': results}, keep_alive)
+                    except (ValueError, TypeError, AttributeError) as e:
+                        await self._respond(writer, 400, {'error': str(e)}, keep_alive)
+                    except Exception as e:
+                        await self._respond(writer, 500, {'error': f"Prediction failed: {e}"}, keep_alive)
+                elif method == 'GET' and path == '/metrics':
+                    await self._respond(writer, 200, self.batcher.metrics(), keep_alive)
+                elif method == 'GET' and path == '/health':
+                    await self._respond(writer, 200, {'status': 'ok', 'model_version': self.classifier.model_version}, keep_alive)
+                else:
+                    await self._respond(writer, 404, {'error': f"No route for {method} {path}"}, keep_alive)
+
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, unix_socket=None):
+        """Run the server until cancelled"""
+        self.batcher.start()
+        if unix_socket:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_socket)
+            print(f"Moodify inference server listening on unix://{unix_socket}")
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+            print(f"Moodify inference server listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket"""
+    def __init__(self, path, timeout):
+        super().__init__('localhost', timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+class InferenceClient:
+    """Client for a running inference server with the MoodClassifier.predict_mood interface
+
+    url is http://host:port or unix:///path/to/socket.
+    """
+    def __init__(self, url, timeout=10):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _request(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else None
+        if self.url.startswith('unix://'):
+            connection = _UnixHTTPConnection(self.url[len('unix://'):], self.timeout)
+            try:
+                connection.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+                response = connection.getresponse()
+                data = response.read()
+                if response.status != 200:
+                    raise RuntimeError(f"Inference server returned {response.status}: {data.decode()}")
+                return json.loads(data)
+            finally:
+                connection.close()
+
+        request = urllib.request.Request(
+            self.url + path, data=body, method=method,
+            headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def predict_mood(self, audio_features):
+        """Predict mood for a feature dict or a list of them"""
+        tracks = [audio_features] if isinstance(audio_features, dict) else list(audio_features)
+        results = self._request('POST', '/predict', {'tracks': tracks})['results']
+        return results[0] if len(results) == 1 else results
+
+    def metrics(self):
+        return self._request('GET', '/metrics')
+
+def main():
+    """Load the model and run the inference server"""
+    from forest_engine import FlatForest
+    from mood_classifier import MoodClassifier
+
+    parser = argparse.ArgumentParser(description="Serve the Moodify mood classifier locally")
+    parser.add_argument('--model-dir', default='models', help="Directory of the saved model")
+    parser.add_argument('--host', default='127.0.0.1', help="TCP host to bind")
+    parser.add_argument('--port', type=int, default=8765, help="TCP port to bind")
+    parser.add_argument('--unix', metavar='SOCKET_PATH', help="Listen on a Unix socket instead of TCP")
+    parser.add_argument('--max-batch-size', type=int, default=256, help="Maximum rows per micro-batch")
+    parser.add_argument('--max-wait-ms', type=float, default=5.0,
+                        help="Maximum time a request waits for its batch to fill")
+    args = parser.parse_args()
+
+    classifier = MoodClassifier()
+    if not classifier.load_model(args.model_dir):
+        raise SystemExit(1)
+    if FlatForest.supports(classifier.model):
+        classifier.compile_forest()
+
+    server = InferenceServer(classifier, args.max_batch_size, args.max_wait_ms)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print("\nInference server stopped")
+
+if __name__ == "__main__":
+    main()
@@ -20,9 +20,10 @@ from kivymd.uix.navigationdrawer import MDNavigationDrawer
 from kivymd.uix.list import OneLineListItem
 from kivymd.theming import ThemableBehavior
 import threading
-from spotify_client import SpotifyClient
-from mood_classifier import MoodClassifier
-import os
+from model_loader import BackgroundLoader, create_track_source, load_candidate_lists, load_classifier
+
+# Audio features the taste profile scores tracks on
+TASTE_FEATURES = ('valence', 'energy', 'danceability', 'tempo')
 
 class MoodButton(MDRaisedButton):
     """Custom mood selection button with animations"""
@@ -124,7 +125,7 @@ class SongCard(MDCard):
             icon="heart-outline",
             theme_icon_color="Custom",
             icon_color="red",
-            on_press=lambda x: self.toggle_favorite()
+            on_press=self.toggle_favorite
         )
         button_layout.add_widget(fav_btn)
         
@@ -136,9 +137,11 @@ class SongCard(MDCard):
         # In a real app, you would implement audio playback here
         print(f"Playing preview for {self.track_info['name']}")
     
-    def toggle_favorite(self):
-        """Toggle favorite status"""
-        print(f"Toggled favorite for {self.track_info['name']}")
+    def toggle_favorite(self, button):
+        """Toggle favorite status and update the app's taste profile"""
+        def show(is_favorite):
+            button.icon = "heart" if is_favorite else "heart-outline"
+        MDApp.get_running_app().toggle_favorite(self.track_info, show)
 
 class MoodScreen(MDScreen):
     """Main mood selection screen"""
@@ -300,6 +303,10 @@ class MoodifyApp(MDApp):
         self.selected_mood = None
         self.spotify_client = None
         self.mood_classifier = None
+        self.favorites = {}
+        # Favorited tracks whose audio features are still being fetched
+        self._pending_favorites = set()
+        self.taste_profile = None
     
     def build(self):
         """Build the app interface"""
@@ -320,24 +327,75 @@ class MoodifyApp(MDApp):
         return self.screen_manager
     
     def init_clients(self):
-        """Initialize Spotify client and mood classifier"""
-        try:
-            self.spotify_client = SpotifyClient()
-            print("Spotify client initialized successfully")
-        except Exception as e:
-            print(f"Failed to initialize Spotify client: {e}")
-        
-        # Load mood classifier if available
-        self.mood_classifier = MoodClassifier()
-        if os.path.exists('models/mood_classifier.pkl'):
-            self.mood_classifier.load_model()
+        """Start loading the Spotify client and mood classifier in the background
+        
+        spotipy and scikit-learn are imported on these threads, so the mood
+        screen is shown without waiting for them.
+        """
+        self._spotify_loader = BackgroundLoader(create_track_source, on_done=self._on_spotify_loaded)
+        self._classifier_loader = BackgroundLoader(load_classifier, on_done=self._on_classifier_loaded)
+        self._candidate_loader = BackgroundLoader(load_candidate_lists)
+    
+    def _on_spotify_loaded(self, client, error):
+        """Store the Spotify client once its background load finishes"""
+        if error is not None:
+            print(f"Failed to initialize Spotify client: {error}")
+            return
+        self.spotify_client = client
+        print("Spotify client initialized successfully")
+    
+    def _on_classifier_loaded(self, classifier, error):
+        """Store the mood classifier once its background load finishes"""
+        if error is not None:
+            print(f"Failed to load mood classifier: {error}")
+            return
+        self.mood_classifier = classifier
+        if self.mood_classifier is not None:
             print("Mood classifier loaded successfully")
         else:
             print("Mood classifier not found, using default recommendations")
     
+    def toggle_favorite(self, track_info, on_done):
+        """Add or remove a favorite track, then call on_done(is_favorite) on the UI thread
+        
+        Audio features missing from track_info are fetched on a background
+        thread; taps on the track are ignored until they arrive.
+        """
+        if self.taste_profile is None:
+            from taste_profile import TasteProfile
+            self.taste_profile = TasteProfile()
+        track_id = track_info['id']
+        if track_id in self._pending_favorites:
+            return
+        if track_id in self.favorites:
+            self.taste_profile.remove(self.favorites.pop(track_id))
+            on_done(False)
+            return
+        if self.taste_profile.add(track_info) or self.spotify_client is None:
+            self.favorites[track_id] = track_info
+            on_done(True)
+            return
+        
+        # Playlists are loaded without audio features until there is a profile to apply
+        def on_features(features, error):
+            Clock.schedule_once(lambda dt: self._add_fetched_favorite(track_info, features, error, on_done), 0)
+        self._pending_favorites.add(track_id)
+        BackgroundLoader(self.spotify_client.get_track_features, track_id, on_done=on_features)
+    
+    def _add_fetched_favorite(self, track_info, features, error, on_done):
+        """Finish favoriting a track once its audio features were fetched"""
+        if error is not None:
+            print(f"Failed to fetch audio features: {error}")
+        elif features:
+            track_info.update({column: features[column] for column in TASTE_FEATURES if column in features})
+            self.taste_profile.add(track_info)
+        self._pending_favorites.discard(track_info['id'])
+        self.favorites[track_info['id']] = track_info
+        on_done(True)
+    
     def load_recommendations(self, mood):
         """Load recommendations for selected mood"""
-        if not self.spotify_client:
+        if self._spotify_loader.done() and not self.spotify_client:
             self.show_error("Spotify client not available")
             return
         
@@ -355,14 +413,40 @@ class MoodifyApp(MDApp):
     def _load_recommendations_thread(self, mood, screen):
         """Load recommendations in background thread"""
         try:
-            # Get recommendations
-            track_ids = self.spotify_client.get_mood_based_recommendations(mood, limit=20)
+            # The Spotify client may still be loading right after startup
+            self.spotify_client = self._spotify_loader.result()
+            
+            # Get recommendations, from the precomputed candidate lists when built
+            try:
+                candidates = self._candidate_loader.result()
+            except Exception as e:
+                print(f"Failed to load candidate lists: {e}")
+                candidates = None
+            pool = candidates.sample_tracks(mood, 20) if candidates is not None and mood in candidates.moods else []
             
-            recommendations = []
-            for track_id in track_ids:
-                track_info = self.spotify_client.get_track_info(track_id)
-                if track_info:
-                    recommendations.append(track_info)
+            if pool and candidates.info_columns:
+                # The lists carry display info and features, so no lookups are needed
+                recommendations = pool
+            else:
+                candidate_features = {track['track_id']: track for track in pool}
+                track_ids = list(candidate_features) or self.spotify_client.get_mood_based_recommendations(mood, limit=20)
+                
+                # Audio features are only needed to apply a taste profile
+                fetched = {}
+                if self.taste_profile is not None and self.taste_profile.count:
+                    missing = [track_id for track_id in track_ids if track_id not in candidate_features]
+                    fetched = dict(zip(missing, self.spotify_client.get_tracks_features(missing))) if missing else {}
+                
+                recommendations = []
+                for track_id, track_info in zip(track_ids, self.spotify_client.get_tracks_info(track_ids)):
+                    if track_info:
+                        features = candidate_features.get(track_id) or fetched.get(track_id)
+                        if features:
+                            track_info.update({column: features[column] for column in TASTE_FEATURES
+                                               if column in features})
+                        recommendations.append(track_info)
+            if self.taste_profile is not None:
+                recommendations = self.taste_profile.rerank(recommendations)
             
             # Update UI on main thread
             Clock.schedule_once(
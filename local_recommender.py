@@ -0,0 +1,135 @@
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+from ann_index import IVFIndex
+
+FEATURE_COLUMNS = [
+    'danceability', 'energy', 'loudness', 'speechiness', 'acousticness',
+    'instrumentalness', 'liveness', 'valence', 'tempo', 'popularity'
+]
+
+TRACK_INFO_COLUMNS = {
+    'id': 'track_id',
+    'name': 'track_name',
+    'artist': 'artist',
+    'album': 'album',
+    'image_url': 'image_url',
+    'preview_url': 'preview_url',
+    'popularity': 'popularity'
+}
+
+class LocalRecommender:
+    """Mood recommendations from the collected dataset without calling the Spotify API
+
+    Tracks are indexed by their standardized audio features in a KD-tree, and a
+    mood's target is the mean feature vector of the tracks labelled with it.
+    Implements the parts of SpotifyClient the apps use
+    (get_mood_based_recommendations and the single and batched track info and
+    feature lookups), so either can serve as the apps' track source. index='ivf' swaps the KD-tree
+    for an approximate IVFIndex, for catalogs of millions of tracks.
+    """
+    def __init__(self, filepath='data/mood_music_dataset.csv', feature_columns=None, leaf_size=40,
+                 index='kdtree', nprobe=16):
+        if not os.path.exists(filepath):
+            raise ValueError(f"Dataset not found at {filepath}. Please run 'python data_collector.py' first.")
+        self.feature_columns = list(feature_columns or FEATURE_COLUMNS)
+
+        df = pd.read_csv(filepath)
+        df = df.dropna(subset=self.feature_columns + ['track_id'])
+        self.tracks = df.drop_duplicates(subset=['track_id']).reset_index(drop=True)
+
+        features = self.tracks[self.feature_columns].to_numpy(dtype=np.float64)
+        self.mean = features.mean(axis=0)
+        self.scale = features.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        normalized = self._normalize(features)
+        if index == 'ivf':
+            self.tree = None
+            self.ann_index = IVFIndex(nlist=max(1, int(np.sqrt(len(normalized)))), nprobe=nprobe)
+            self.ann_index.train(normalized).add(normalized)
+        else:
+            self.tree = KDTree(normalized, leaf_size=leaf_size)
+            self.ann_index = None
+        self.track_ids = self.tracks['track_id'].to_numpy()
+        self._rows = {track_id: row for row, track_id in enumerate(self.track_ids)}
+
+        self.mood_targets = {}
+        if 'mood' in self.tracks:
+            for mood, group in self.tracks.groupby('mood'):
+                self.mood_targets[mood] = group[self.feature_columns].mean().to_dict()
+
+    def _normalize(self, features):
+        return (features - self.mean) / self.scale
+
+    def _as_vector(self, target):
+        """Raw feature vector for a feature dict; unspecified features use the dataset mean"""
+        return np.array([target.get(c, self.mean[i]) for i, c in enumerate(self.feature_columns)],
+                        dtype=np.float64)
+
+    def nearest(self, target, k=20, exclude=()):
+        """Track IDs and distances of the k tracks nearest to a feature dict
+
+        Distances are in standardized feature space. Track IDs in exclude are
+        skipped.
+        """
+        exclude = set(exclude)
+        k_query = min(k + len(exclude), len(self.tracks))
+        if k_query == 0:
+            return [], []
+        query = self._normalize(self._as_vector(target))[np.newaxis]
+        if self.ann_index is not None:
+            rows, squared = self.ann_index.search(query, k=k_query)
+            found = rows[0] >= 0
+            rows, distances = rows[:, found], np.sqrt(squared[:, found])
+        else:
+            distances, rows = self.tree.query(query, k=k_query)
+        track_ids = self.track_ids[rows[0]]
+        results = [(track_id, distance) for track_id, distance in zip(track_ids, distances[0])
+                   if track_id not in exclude][:k]
+        return [track_id for track_id, _ in results], [float(distance) for _, distance in results]
+
+    def get_mood_based_recommendations(self, mood, limit=20, exclude=()):
+        """IDs of the tracks nearest to the mood's target, like SpotifyClient's"""
+        if mood not in self.mood_targets:
+            if not self.mood_targets:
+                return []
+            mood = 'Happy' if 'Happy' in self.mood_targets else next(iter(self.mood_targets))
+        track_ids, _ = self.nearest(self.mood_targets[mood], k=limit, exclude=exclude)
+        return track_ids
+
+    def get_track_info(self, track_id):
+        """Basic track information in SpotifyClient.get_track_info's format"""
+        row = self._rows.get(track_id)
+        if row is None:
+            return None
+        track = self.tracks.iloc[row]
+        info = {}
+        for key, column in TRACK_INFO_COLUMNS.items():
+            value = track.get(column)
+            info[key] = None if pd.isna(value) else value.item() if isinstance(value, np.generic) else value
+        return info
+
+    def get_tracks_info(self, track_ids):
+        """get_track_info for many tracks, aligned with track_ids"""
+        return [self.get_track_info(track_id) for track_id in track_ids]
+
+    def get_track_features(self, track_id):
+        """Audio features of a track, keyed like the Spotify audio features response"""
+        row = self._rows.get(track_id)
+        if row is None:
+            return None
+        features = {column: float(value) for column, value in
+                    self.tracks.iloc[row][self.feature_columns].items()}
+        # Key and mode are collected but not used as model features
+        for column in ('key', 'mode'):
+            if column in self.tracks and pd.notna(self.tracks.at[row, column]):
+                features[column] = int(self.tracks.at[row, column])
+        features['id'] = track_id
+        return features
+
+    def get_tracks_features(self, track_ids):
+        """get_track_features for many tracks, aligned with track_ids"""
+        return [self.get_track_features(track_id) for track_id in track_ids]
@@ -0,0 +1,110 @@
+import json
+import struct
+
+import numpy as np
+
+from forest_engine import FlatForest
+
+MAGIC = b'MOODIFY\x00'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+ARTIFACT_FILENAME = 'mood_classifier.mfa'
+
+FOREST_BLOCKS = {
+    'feature': '<i8',
+    'threshold': '<f8',
+    'left': '<i8',
+    'right': '<i8',
+    'values': '<f8',
+    'roots': '<i8',
+    'children': '<i8'
+}
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def save_blocks(path, arrays, header, magic=MAGIC):
+    """Write named arrays and a JSON-serializable header to a single file
+
+    Layout: 8-byte magic, little-endian uint64 header length, UTF-8 JSON header,
+    then one raw array block per array, each aligned to 64 bytes. The header
+    records every block's dtype, shape and absolute offset.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    # Offsets depend on the header length, which depends on the offsets; pad
+    # the header to a fixed aligned size and retry if it grows past it
+    reserved = ALIGNMENT
+    while True:
+        offset = _aligned(len(magic) + 8 + reserved)
+        blocks = {}
+        for name, array in arrays.items():
+            blocks[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+            offset = _aligned(offset + array.nbytes)
+        encoded = json.dumps(dict(header, blocks=blocks)).encode('utf-8')
+        if len(encoded) <= reserved:
+            break
+        reserved = _aligned(len(encoded))
+
+    with open(path, 'wb') as f:
+        f.write(magic)
+        f.write(struct.pack('<Q', reserved))
+        f.write(encoded.ljust(reserved, b' '))
+        for name, array in arrays.items():
+            f.seek(blocks[name]['offset'])
+            f.write(array.tobytes())
+
+def read_block_header(path, magic=MAGIC):
+    """Read only the JSON header of a file written by save_blocks"""
+    with open(path, 'rb') as f:
+        if f.read(len(magic)) != magic:
+            raise ValueError(f"{path} does not start with the expected magic {magic!r}")
+        (length,) = struct.unpack('<Q', f.read(8))
+        return json.loads(f.read(length).decode('utf-8'))
+
+def load_blocks(path, magic=MAGIC):
+    """Memory-map a file written by save_blocks; returns ({name: read-only array}, header)"""
+    header = read_block_header(path, magic)
+    data = np.memmap(path, dtype=np.uint8, mode='r')
+    arrays = {}
+    for name, block in header['blocks'].items():
+        dtype = np.dtype(block['dtype'])
+        count = int(np.prod(block['shape']))
+        start = block['offset']
+        arrays[name] = data[start:start + count * dtype.itemsize].view(dtype).reshape(block['shape'])
+    return arrays, header
+
+def save_artifact(forest, path, header):
+    """Write a FlatForest and a JSON-serializable header to a single artifact file
+
+    The forest arrays are stored as little-endian blocks (see save_blocks).
+    """
+    arrays = {name: np.asarray(getattr(forest, name), dtype=dtype)
+              for name, dtype in FOREST_BLOCKS.items()}
+    header = dict(header, format_version=FORMAT_VERSION, max_depth=forest.max_depth)
+    save_blocks(path, arrays, header)
+
+def read_header(path):
+    """Read only the JSON header of an artifact"""
+    try:
+        header = read_block_header(path)
+    except ValueError:
+        raise ValueError(f"{path} is not a Moodify model artifact") from None
+    if header.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format version {header.get('format_version')}")
+    return header
+
+def load_artifact(path):
+    """Memory-map an artifact; returns (FlatForest backed by the file, header)
+
+    The forest arrays are read-only views of the mapped file, so loading costs
+    only the JSON parse and processes loading the same file share its pages.
+    """
+    read_header(path)
+    arrays, header = load_blocks(path)
+    forest = FlatForest(
+        arrays['feature'], arrays['threshold'], arrays['left'], arrays['right'],
+        arrays['values'], arrays['roots'], header['max_depth'],
+        # Artifacts written before children was stored rebuild it here
+        children=arrays.get('children')
+    )
+    return forest, header
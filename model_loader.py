@@ -0,0 +1,116 @@
+import os
+import threading
+from dotenv import load_dotenv
+
+# Settings such as MOODIFY_TRACK_SOURCE may live in .env, which the heavy
+# modules that used to load it are no longer imported early enough to read
+load_dotenv()
+
+def model_available(model_dir='models'):
+    """Whether a saved model (artifact or pickles) exists in model_dir"""
+    return (os.path.exists(os.path.join(model_dir, 'mood_classifier.mfa')) or
+            os.path.exists(os.path.join(model_dir, 'mood_classifier.pkl')))
+
+def load_classifier(model_dir='models'):
+    """Load the mood classifier for the apps, or None if no model is available
+
+    Uses a running inference server when MOODIFY_INFERENCE_URL is set. A local
+    model is wrapped in a PredictionCache, persisted to the SQLite file
+    MOODIFY_PREDICTION_CACHE when that is set.
+    scikit-learn, pandas and NumPy are only imported here, on first use.
+    """
+    inference_url = os.getenv('MOODIFY_INFERENCE_URL')
+    if inference_url:
+        from inference_server import InferenceClient
+        return InferenceClient(inference_url)
+
+    if not model_available(model_dir):
+        return None
+
+    from mood_classifier import MoodClassifier
+    classifier = MoodClassifier()
+    if not classifier.load_model(model_dir):
+        return None
+    from prediction_cache import PredictionCache
+    return PredictionCache(classifier, path=os.getenv('MOODIFY_PREDICTION_CACHE'))
+
+def create_spotify_client():
+    """Create the Spotify client, importing spotipy on first use"""
+    from spotify_client import SpotifyClient
+    return SpotifyClient()
+
+def create_track_source():
+    """Create the apps' source of tracks and recommendations
+
+    MOODIFY_TRACK_SOURCE=local serves them from the collected dataset with a
+    LocalRecommender instead of the Spotify API.
+    """
+    if os.getenv('MOODIFY_TRACK_SOURCE', 'spotify').lower() == 'local':
+        from local_recommender import LocalRecommender
+        return LocalRecommender(os.getenv('MOODIFY_DATASET', 'data/mood_music_dataset.csv'))
+    return create_spotify_client()
+
+def saved_model_version(model_dir='models'):
+    """model_version of the model saved in model_dir, without loading it; None if there is none
+
+    Read from the artifact header, or the pickle's content hash as
+    MoodClassifier.load_model computes it.
+    """
+    artifact_path = os.path.join(model_dir, 'mood_classifier.mfa')
+    if os.path.exists(artifact_path):
+        import model_artifact
+        return model_artifact.read_header(artifact_path)['model']['model_version']
+    model_path = os.path.join(model_dir, 'mood_classifier.pkl')
+    if os.path.exists(model_path):
+        import hashlib
+        with open(model_path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()[:16]
+    return None
+
+def load_candidate_lists(model_dir='models'):
+    """Memory-map the precomputed per-mood candidate lists, or None if none were built
+
+    Build them with 'python candidate_lists.py'. Lists built by a model other
+    than the one saved in model_dir raise a ValueError.
+    """
+    path = os.path.join(model_dir, 'mood_candidates.bin')
+    if not os.path.exists(path):
+        return None
+    from candidate_lists import CandidateLists
+    return CandidateLists(path, model_version=saved_model_version(model_dir))
+
+class BackgroundLoader:
+    """Runs a loading function on a daemon thread so startup does not wait for it
+
+    on_done(result, error) is called on the loading thread before done()
+    becomes true, so anything it stores is visible to callers of result().
+    """
+    def __init__(self, load_fn, *args, on_done=None):
+        self._result = None
+        self._error = None
+        self._done = threading.Event()
+        self._on_done = on_done
+        self._thread = threading.Thread(target=self._run, args=(load_fn, args), daemon=True)
+        self._thread.start()
+
+    def _run(self, load_fn, args):
+        try:
+            self._result = load_fn(*args)
+        except Exception as e:
+            self._error = e
+        try:
+            if self._on_done is not None:
+                self._on_done(self._result, self._error)
+        finally:
+            self._done.set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        """Wait for the load to finish and return its result, re-raising its error"""
+        if not self._done.wait(timeout):
+            raise TimeoutError("Background load has not finished")
+        if self._error is not None:
+            raise self._error
+        return self._result
@@ -1,21 +1,104 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.linear_model import SGDClassifier, LogisticRegression
+from sklearn.tree import DecisionTreeRegressor
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import classification_report, confusion_matrix
+from sklearn.metrics import classification_report, confusion_matrix, f1_score
+from forest_engine import FlatForest
+import model_artifact
+from mood_profiles import (PROFILES_FILENAME, compute_mood_profiles, load_mood_profiles,
+                           mood_characteristics, save_mood_profiles)
 import joblib
+import contextlib
+import hashlib
+import math
 import os
+import tempfile
+import uuid
+
+# Estimator factories selectable through MoodClassifier(backend=...)
+BACKENDS = {
+    'rf': lambda random_state=42: RandomForestClassifier(
+        n_estimators=100,
+        random_state=random_state,
+        max_depth=10,
+        min_samples_split=5,
+        min_samples_leaf=2
+    ),
+    'hgb': lambda random_state=42: HistGradientBoostingClassifier(
+        max_iter=100,
+        learning_rate=0.1,
+        max_leaf_nodes=31,
+        random_state=random_state
+    ),
+    'sgd': lambda random_state=42: SGDClassifier(
+        loss='log_loss',
+        alpha=1e-4,
+        average=True,
+        random_state=random_state
+    )
+}
+
+# Upper bound on the shuffle buckets of train_out_of_core, which bounds the
+# files appended to per chunk; larger datasets get larger buckets
+MAX_SHUFFLE_BUCKETS = 256
+
+def make_estimator(backend, random_state=42):
+    """Create a fresh estimator for the given backend name"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[backend](random_state)
+
+class SeedEnsemble:
+    """Averages the probabilities of estimators trained with different seeds"""
+    def __init__(self, estimators):
+        self.estimators = estimators
+        self.classes_ = estimators[0].classes_
+    
+    def predict_proba(self, X):
+        return np.mean([estimator.predict_proba(X) for estimator in self.estimators], axis=0)
+    
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+    
+    def score(self, X, y):
+        return float(np.mean(self.predict(X) == y))
+    
+    @property
+    def feature_importances_(self):
+        return np.mean([estimator.feature_importances_ for estimator in self.estimators], axis=0)
+
+def backend_of(model):
+    """Backend name of a fitted estimator or SeedEnsemble, or None if it matches none"""
+    estimator = model.estimators[0] if isinstance(model, SeedEnsemble) else model
+    for backend, factory in BACKENDS.items():
+        if type(estimator) is type(factory()):
+            return backend
+    return None
+
+def _fit_seed(backend, X, y, seed, n_classes, test_size=0.2):
+    """Fit and evaluate one seed of a multi-seed run (executed in a worker process)"""
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=seed, stratify=y
+    )
+    model = make_estimator(backend, random_state=seed)
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+    return {
+        'seed': seed,
+        'model': model,
+        'accuracy': float(np.mean(y_pred == y_test)),
+        'f1': f1_score(y_test, y_pred, labels=np.arange(n_classes), average=None, zero_division=0),
+        'importances': getattr(model, 'feature_importances_', None)
+    }
 
 class MoodClassifier:
-    def __init__(self):
-        self.model = RandomForestClassifier(
-            n_estimators=100,
-            random_state=42,
-            max_depth=10,
-            min_samples_split=5,
-            min_samples_leaf=2
-        )
+    def __init__(self, backend='rf', random_state=42):
+        self.backend = backend
+        self.random_state = random_state
+        self.model = make_estimator(backend, random_state)
         self.scaler = StandardScaler()
         self.label_encoder = LabelEncoder()
         self.feature_columns = [
@@ -24,6 +107,17 @@ class MoodClassifier:
             'valence', 'tempo', 'popularity'
         ]
         self.is_trained = False
+        self.flat_forest = None
+        self.student = None
+        self.model_version = None
+        self.mood_profiles = None
+    
+    def _mark_trained(self, model_version=None):
+        """Record that a new model is in place, invalidating anything derived from the old one"""
+        self.flat_forest = None
+        self.student = None
+        self.model_version = model_version or uuid.uuid4().hex[:16]
+        self.is_trained = True
     
     def load_data(self, filepath='data/mood_music_dataset.csv'):
         """Load the mood music dataset"""
@@ -53,82 +147,379 @@ class MoodClassifier:
         
         return X, y
     
-    def train(self, df=None, filepath='data/mood_music_dataset.csv'):
-        """Train the mood classification model"""
+    def train(self, df=None, filepath='data/mood_music_dataset.csv', profiler=None):
+        """Train the mood classification model
+        
+        Pass a TrainingProfiler as profiler to record time and memory per phase.
+        """
+        phase = profiler.phase if profiler is not None else (lambda name: contextlib.nullcontext())
+        
+        # A model loaded from an artifact keeps only its flattened forest
+        if self.model is None:
+            self.model = make_estimator(self.backend, self.random_state)
+        
         if df is None:
-            df = self.load_data(filepath)
+            with phase('load_data'):
+                df = self.load_data(filepath)
         
-        # Preprocess data
-        X, y = self.preprocess_data(df)
+        # Preprocess data and encode labels
+        with phase('preprocess'):
+            X, y = self.preprocess_data(df)
+            y_encoded = self.label_encoder.fit_transform(y)
         
-        # Encode labels
-        y_encoded = self.label_encoder.fit_transform(y)
+        with phase('mood_profiles'):
+            self.mood_profiles = compute_mood_profiles(
+                X.to_numpy(dtype=np.float64), y_encoded, self.label_encoder.classes_, self.feature_columns
+            )
         
         # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded
-        )
+        with phase('split'):
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, y_encoded, test_size=0.2, random_state=self.random_state, stratify=y_encoded
+            )
         
         # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        with phase('scale'):
+            X_train_scaled = self.scaler.fit_transform(X_train)
+            X_test_scaled = self.scaler.transform(X_test)
         
         # Train model
-        print("Training Random Forest model...")
-        self.model.fit(X_train_scaled, y_train)
+        print(f"Training {type(self.model).__name__} model...")
+        with phase('fit'):
+            self.model.fit(X_train_scaled, y_train)
         
         # Evaluate model
-        train_score = self.model.score(X_train_scaled, y_train)
-        test_score = self.model.score(X_test_scaled, y_test)
+        with phase('score'):
+            train_score = self.model.score(X_train_scaled, y_train)
+            test_score = self.model.score(X_test_scaled, y_test)
         
         print(f"Training accuracy: {train_score:.3f}")
         print(f"Testing accuracy: {test_score:.3f}")
         
         # Cross-validation
-        cv_scores = cross_val_score(self.model, X_train_scaled, y_train, cv=5)
+        with phase('cross_validation'):
+            cv_scores = cross_val_score(self.model, X_train_scaled, y_train, cv=5)
         print(f"Cross-validation accuracy: {cv_scores.mean():.3f} (+/- {cv_scores.std() * 2:.3f})")
         
         # Detailed evaluation
-        y_pred = self.model.predict(X_test_scaled)
+        with phase('report'):
+            y_pred = self.model.predict(X_test_scaled)
+            report = classification_report(y_test, y_pred, target_names=self.label_encoder.classes_)
+            
+            # Feature importance (not every backend exposes it)
+            feature_importance = None
+            if hasattr(self.model, 'feature_importances_'):
+                feature_importance = pd.DataFrame({
+                    'feature': self.feature_columns,
+                    'importance': self.model.feature_importances_
+                }).sort_values('importance', ascending=False)
+        
         print("\nClassification Report:")
-        print(classification_report(y_test, y_pred, target_names=self.label_encoder.classes_))
+        print(report)
         
-        # Feature importance
-        feature_importance = pd.DataFrame({
-            'feature': self.feature_columns,
-            'importance': self.model.feature_importances_
-        }).sort_values('importance', ascending=False)
+        if feature_importance is not None:
+            print("\nFeature Importance:")
+            print(feature_importance)
         
-        print("\nFeature Importance:")
-        print(feature_importance)
+        self._mark_trained()
+        return train_score, test_score
+    
+    def _iter_chunks(self, filepath, chunksize, test_size):
+        """Stream (features, labels, test mask) chunks from a CSV dataset"""
+        # Re-seeding on every pass keeps the train/test split identical across passes
+        rng = np.random.default_rng(self.random_state)
+        reader = pd.read_csv(filepath, usecols=self.feature_columns + ['mood'], chunksize=chunksize)
+        for chunk in reader:
+            chunk = chunk.dropna(subset=self.feature_columns + ['mood'])
+            if chunk.empty:
+                continue
+            X = chunk[self.feature_columns].to_numpy(dtype=np.float64)
+            y = chunk['mood'].to_numpy()
+            is_test = rng.random(len(chunk)) < test_size
+            yield X, y, is_test
+    
+    def train_out_of_core(self, filepath='data/mood_music_dataset.csv', chunksize=100000,
+                          n_epochs=3, test_size=0.2, profile_rows=200000):
+        """Train on a dataset larger than memory by streaming it in chunks
         
-        self.is_trained = True
+        Scaler statistics are accumulated with StandardScaler.partial_fit and the
+        model is trained with partial_fit (falling back to the 'sgd' backend when the
+        selected one has no partial_fit), so only about one chunk is held in memory
+        at a time. The first pass also deals every training row into a random
+        on-disk bucket of roughly chunksize rows (larger once there would be more
+        than MAX_SHUFFLE_BUCKETS), and training loads one bucket at a time in
+        random order, so each batch mixes rows from the whole file however it is
+        sorted (the collectors write it grouped by mood). Mood profiles are
+        computed from a random sample of about profile_rows rows.
+        """
+        if not os.path.exists(filepath):
+            raise FileNotFoundError(f"Dataset not found at {filepath}. Please run data_collector.py first.")
+        
+        # Only estimators with partial_fit can learn chunk by chunk
+        if not hasattr(self.model, 'partial_fit'):
+            print(f"Backend '{self.backend}' does not support chunked training, using 'sgd'")
+            self.backend = 'sgd'
+        self.model = make_estimator(self.backend, self.random_state)
+        self.scaler = StandardScaler()
+        rng = np.random.default_rng(self.random_state)
+        n_features = len(self.feature_columns)
+        # Assume about 100 bytes per CSV row, so a bucket holds roughly one chunk
+        n_buckets = min(MAX_SHUFFLE_BUCKETS, max(1, math.ceil(os.path.getsize(filepath) / (100 * chunksize))))
+        
+        with tempfile.TemporaryDirectory(prefix='moodify_shuffle_') as scratch:
+            bucket_paths = [os.path.join(scratch, f'bucket_{b}.bin') for b in range(n_buckets)]
+            
+            # First pass: streaming scaler statistics, the set of mood labels and
+            # the shuffle buckets; rows are stored as float64 features plus a
+            # provisional mood code
+            print("Computing scaler statistics and shuffling the dataset...")
+            all_moods = set()
+            mood_codes = {}
+            n_rows = 0
+            for X, y, is_test in self._iter_chunks(filepath, chunksize, test_size):
+                all_moods.update(y)
+                n_rows += len(y)
+                X_train, y_train = X[~is_test], y[~is_test]
+                if len(y_train) == 0:
+                    continue
+                self.scaler.partial_fit(X_train)
+                moods, inverse = np.unique(y_train, return_inverse=True)
+                codes = np.array([mood_codes.setdefault(mood, len(mood_codes)) for mood in moods])
+                rows = np.column_stack([X_train, codes[inverse]])
+                assignment = rng.integers(n_buckets, size=len(rows))
+                order = np.argsort(assignment, kind='stable')
+                bounds = np.searchsorted(assignment[order], np.arange(n_buckets + 1))
+                # Buckets are only open while appending to them, so the number
+                # of buckets is not limited by the open file limit
+                for b in np.flatnonzero(bounds[1:] > bounds[:-1]):
+                    with open(bucket_paths[b], 'ab') as bucket:
+                        bucket.write(rows[order[bounds[b]:bounds[b + 1]]].tobytes())
+            
+            if n_rows == 0:
+                raise ValueError(f"No usable rows found in {filepath}")
+            
+            self.label_encoder.fit(sorted(all_moods))
+            classes = np.arange(len(self.label_encoder.classes_))
+            code_labels = self.label_encoder.transform(list(mood_codes)) if mood_codes else np.empty(0, dtype=int)
+            print(f"Streaming {n_rows} tracks in {n_buckets} shuffled buckets")
+            
+            # Training passes: buckets in random order, rows shuffled within each
+            for epoch in range(n_epochs):
+                print(f"Training epoch {epoch + 1}/{n_epochs}...")
+                for b in rng.permutation(n_buckets):
+                    if not os.path.exists(bucket_paths[b]):
+                        continue
+                    rows = np.fromfile(bucket_paths[b], dtype=np.float64).reshape(-1, n_features + 1)
+                    rows = rows[rng.permutation(len(rows))]
+                    X_train = self.scaler.transform(rows[:, :n_features])
+                    y_train = code_labels[rows[:, n_features].astype(np.int64)]
+                    for start in range(0, len(rows), chunksize):
+                        self.model.partial_fit(X_train[start:start + chunksize], y_train[start:start + chunksize],
+                                               classes=classes)
+        
+        # Evaluation pass, which also samples rows for the mood profiles
+        correct = {'train': 0, 'test': 0}
+        total = {'train': 0, 'test': 0}
+        profile_fraction = min(1.0, profile_rows / n_rows)
+        profile_X, profile_y = [], []
+        for X, y, is_test in self._iter_chunks(filepath, chunksize, test_size):
+            y_encoded = self.label_encoder.transform(y)
+            sampled = rng.random(len(y)) < profile_fraction
+            profile_X.append(X[sampled])
+            profile_y.append(y_encoded[sampled])
+            hits = self.model.predict(self.scaler.transform(X)) == y_encoded
+            correct['train'] += int(hits[~is_test].sum())
+            correct['test'] += int(hits[is_test].sum())
+            total['train'] += int((~is_test).sum())
+            total['test'] += int(is_test.sum())
+        
+        self.mood_profiles = compute_mood_profiles(
+            np.concatenate(profile_X), np.concatenate(profile_y), self.label_encoder.classes_,
+            self.feature_columns
+        )
+        
+        train_score = correct['train'] / total['train'] if total['train'] else float('nan')
+        test_score = correct['test'] / total['test'] if total['test'] else float('nan')
+        
+        print(f"Training accuracy: {train_score:.3f}")
+        print(f"Testing accuracy: {test_score:.3f}")
+        
+        self._mark_trained()
         return train_score, test_score
     
-    def predict_mood(self, audio_features):
-        """Predict mood from audio features"""
+    def train_multi_seed(self, df=None, filepath='data/mood_music_dataset.csv', seeds=5,
+                         n_jobs=-1, keep='best'):
+        """Train one model per seed in parallel and report the spread of the results
+        
+        seeds is a count or an explicit list of seeds; each seed controls both the
+        train/test split and the estimator. The scaler is fitted once on the full
+        dataset so every run shares the same input space, and the scaled matrix is
+        memory-mapped read-only into the worker processes by joblib. keep='best'
+        keeps the most accurate run, keep='ensemble' averages all of them.
+        """
+        if keep not in ('best', 'ensemble'):
+            raise ValueError("keep must be 'best' or 'ensemble'")
+        if isinstance(seeds, int):
+            seeds = [self.random_state + i for i in range(seeds)]
+        
+        if df is None:
+            df = self.load_data(filepath)
+        
+        X, y = self.preprocess_data(df)
+        y_encoded = self.label_encoder.fit_transform(y)
+        self.mood_profiles = compute_mood_profiles(
+            X.to_numpy(dtype=np.float64), y_encoded, self.label_encoder.classes_, self.feature_columns
+        )
+        X_scaled = self.scaler.fit_transform(X)
+        n_classes = len(self.label_encoder.classes_)
+        
+        print(f"Training {len(seeds)} seeds of backend '{self.backend}' in parallel...")
+        runs = joblib.Parallel(n_jobs=n_jobs)(
+            joblib.delayed(_fit_seed)(self.backend, X_scaled, y_encoded, seed, n_classes)
+            for seed in seeds
+        )
+        
+        accuracies = np.array([run['accuracy'] for run in runs])
+        f1_scores = np.array([run['f1'] for run in runs])
+        summary = {
+            'seeds': list(seeds),
+            'accuracy_mean': float(accuracies.mean()),
+            'accuracy_std': float(accuracies.std()),
+            'accuracy_min': float(accuracies.min()),
+            'accuracy_max': float(accuracies.max()),
+            'f1_mean': dict(zip(self.label_encoder.classes_, f1_scores.mean(axis=0))),
+            'f1_std': dict(zip(self.label_encoder.classes_, f1_scores.std(axis=0)))
+        }
+        
+        print(f"Testing accuracy: {summary['accuracy_mean']:.3f} (+/- {summary['accuracy_std'] * 2:.3f}), "
+              f"range {summary['accuracy_min']:.3f}-{summary['accuracy_max']:.3f}")
+        print("\nPer-class F1 (mean +/- std):")
+        for mood in self.label_encoder.classes_:
+            print(f"  {mood}: {summary['f1_mean'][mood]:.3f} +/- {summary['f1_std'][mood]:.3f}")
+        
+        if all(run['importances'] is not None for run in runs):
+            importances = np.array([run['importances'] for run in runs])
+            feature_importance = pd.DataFrame({
+                'feature': self.feature_columns,
+                'importance': importances.mean(axis=0),
+                'std': importances.std(axis=0)
+            }).sort_values('importance', ascending=False)
+            summary['feature_importance'] = feature_importance
+            
+            print("\nFeature Importance:")
+            print(feature_importance)
+        
+        if keep == 'best':
+            best = runs[int(np.argmax(accuracies))]
+            self.model = best['model']
+            print(f"\nKeeping best run (seed {best['seed']}, accuracy {best['accuracy']:.3f})")
+        else:
+            self.model = SeedEnsemble([run['model'] for run in runs])
+            print(f"\nKeeping an ensemble of {len(runs)} runs")
+        
+        self._mark_trained()
+        return summary
+    
+    def distill(self, df=None, filepath='data/mood_music_dataset.csv', student='tree', max_depth=6):
+        """Train a compact student model on the trained model's soft probabilities
+        
+        student='tree' fits a single shallow multi-output regression tree to the
+        teacher's probability vectors; student='linear' fits a multinomial logistic
+        regression with each row weighted by the teacher's class probabilities.
+        Agreement with the teacher is measured on the same held-out split train()
+        uses. The student is saved alongside the model by save_model and used by
+        predict_mood(..., fast=True).
+        """
         if not self.is_trained:
             raise ValueError("Model not trained. Please train the model first.")
+        if student not in ('tree', 'linear'):
+            raise ValueError("student must be 'tree' or 'linear'")
         
-        # Convert to DataFrame if it's a dictionary
-        if isinstance(audio_features, dict):
-            audio_features = pd.DataFrame([audio_features])
+        if df is None:
+            df = self.load_data(filepath)
+        X, y = self.preprocess_data(df)
+        y_encoded = self.label_encoder.transform(y)
+        X_train, X_test, y_train, y_test = train_test_split(
+            X.to_numpy(dtype=np.float64), y_encoded, test_size=0.2,
+            random_state=self.random_state, stratify=y_encoded
+        )
+        X_train_scaled, X_test_scaled = self._scale(X_train), self._scale(X_test)
+        soft_targets = self._predict_proba(X_train)
+        n_classes = soft_targets.shape[1]
         
-        # Select and order features
-        features = audio_features[self.feature_columns].copy()
+        print(f"Distilling a {student} student from {type(self.model).__name__}...")
+        if student == 'tree':
+            model = DecisionTreeRegressor(max_depth=max_depth, random_state=self.random_state)
+            model.fit(X_train_scaled, soft_targets)
+        else:
+            # One copy of every row per class, weighted by the teacher's probability
+            model = LogisticRegression(max_iter=1000)
+            model.fit(
+                np.repeat(X_train_scaled, n_classes, axis=0),
+                np.tile(np.arange(n_classes), len(X_train_scaled)),
+                sample_weight=soft_targets.ravel()
+            )
+        self.student = model
         
-        # Handle missing values
-        features = features.fillna(features.mean())
+        teacher_labels = np.argmax(self._predict_proba(X_test), axis=1)
+        student_labels = np.argmax(self._student_proba(X_test_scaled), axis=1)
+        report = {
+            'student': student,
+            'agreement': float(np.mean(student_labels == teacher_labels)),
+            'teacher_accuracy': float(np.mean(teacher_labels == y_test)),
+            'student_accuracy': float(np.mean(student_labels == y_test))
+        }
         
-        # Scale features
-        features_scaled = self.scaler.transform(features)
+        print(f"Agreement with teacher: {report['agreement']:.3f}")
+        print(f"Teacher accuracy: {report['teacher_accuracy']:.3f}")
+        print(f"Student accuracy: {report['student_accuracy']:.3f}")
+        return report
+    
+    def _student_proba(self, X_scaled):
+        """Class probabilities from the distilled student for scaled features"""
+        if self.student is None:
+            raise ValueError("No student model. Please run distill() first.")
+        if hasattr(self.student, 'predict_proba'):
+            return self.student.predict_proba(X_scaled)
+        # Regression tree leaves hold averaged teacher probability vectors
+        return self.student.predict(X_scaled)
+    
+    def predict_mood(self, audio_features, fast=False):
+        """Predict mood from audio features
+        
+        fast=True routes to the distilled student model; a single dict is then
+        converted straight to an array and missing values use the training mean.
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained. Please train the model first.")
+        
+        if fast and isinstance(audio_features, dict):
+            features = np.array([[audio_features.get(column, np.nan) for column in self.feature_columns]],
+                                dtype=np.float64)
+            probabilities = self._student_proba(self._scale(features))
+        else:
+            # Convert to DataFrame if it's a dictionary
+            if isinstance(audio_features, dict):
+                audio_features = pd.DataFrame([audio_features])
+            
+            # Select and order features
+            features = audio_features[self.feature_columns].copy()
+            
+            # Handle missing values
+            features = features.fillna(features.mean())
+            
+            # Scale and predict; the forest is evaluated once and the label is the
+            # most probable class, exactly as the estimator's predict() would do
+            features = features.to_numpy(dtype=np.float64)
+            if fast:
+                probabilities = self._student_proba(self._scale(features))
+            else:
+                probabilities = self._predict_proba(features)
         
-        # Predict
-        predictions = self.model.predict(features_scaled)
-        probabilities = self.model.predict_proba(features_scaled)
+        predictions = np.argmax(probabilities, axis=1)
         
         # Decode labels
-        mood_predictions = self.label_encoder.inverse_transform(predictions)
+        mood_predictions = self.label_encoder.classes_[predictions]
         
         # Create results with probabilities
         results = []
@@ -142,21 +533,83 @@ class MoodClassifier:
         
         return results[0] if len(results) == 1 else results
     
+    def _as_feature_array(self, features):
+        """Convert an array or column mapping to a float64 matrix in feature_columns order"""
+        if isinstance(features, np.ndarray):
+            X = features
+        else:
+            X = np.column_stack([np.asarray(features[column]) for column in self.feature_columns])
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != len(self.feature_columns):
+            raise ValueError(f"Expected {len(self.feature_columns)} features in the order "
+                             f"{self.feature_columns}, got {X.shape[1]}")
+        return X
+    
+    def _scale(self, X):
+        """Apply the fitted scaler to a float64 matrix, imputing NaN with the training mean"""
+        mean, scale = self.scaler.mean_, self.scaler.scale_
+        missing = np.isnan(X)
+        if missing.any():
+            X = np.where(missing, mean, X)
+        # Same arithmetic as StandardScaler.transform, without its validation overhead
+        return (X - mean) / scale
+    
+    def _predict_proba(self, X):
+        """Class probabilities for a raw float64 feature matrix"""
+        if self.flat_forest is not None:
+            missing = np.isnan(X)
+            if missing.any():
+                X = np.where(missing, self.scaler.mean_, X)
+            return self.flat_forest.predict_proba(X)
+        return self.model.predict_proba(self._scale(X))
+    
+    def compile_forest(self):
+        """Flatten the trained forest and scaler into a FlatForest used for prediction
+        
+        Predictions are bit-identical to the sklearn model but avoid its per-call
+        overhead. Only tree-based models (the 'rf' backend) can be compiled;
+        training or loading a model drops the compiled forest.
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained. Please train the model first.")
+        # Models loaded from an artifact are already flat
+        if self.model is not None:
+            self.flat_forest = FlatForest.from_estimator(self.model, self.scaler)
+        return self.flat_forest
+    
+    def predict_batch(self, features, fast=False):
+        """Vectorized prediction for many tracks without building DataFrames
+        
+        features is an (n_tracks, n_features) array in feature_columns order (any
+        float dtype, float32 is fine) or a mapping of column name to array. Missing
+        values are imputed with the training mean. Returns NumPy arrays
+        (label_indices, confidences, probabilities); label indices refer to
+        label_encoder.classes_. fast=True uses the distilled student model.
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained. Please train the model first.")
+        
+        X = self._as_feature_array(features)
+        probabilities = self._student_proba(self._scale(X)) if fast else self._predict_proba(X)
+        label_indices = np.argmax(probabilities, axis=1)
+        confidences = probabilities[np.arange(len(label_indices)), label_indices]
+        return label_indices, confidences, probabilities
+    
     def get_mood_characteristics(self):
-        """Get the characteristic audio features for each mood"""
-        if not hasattr(self, 'label_encoder') or not self.is_trained:
-            # Return default characteristics if model not trained
-            return {
-                'Happy': {'valence': 0.8, 'energy': 0.7, 'danceability': 0.7, 'tempo': 120},
-                'Sad': {'valence': 0.2, 'energy': 0.3, 'danceability': 0.4, 'tempo': 80},
-                'Angry': {'valence': 0.3, 'energy': 0.9, 'danceability': 0.5, 'tempo': 140},
-                'Calm': {'valence': 0.5, 'energy': 0.2, 'danceability': 0.3, 'tempo': 70},
-                'Energetic': {'valence': 0.7, 'energy': 0.9, 'danceability': 0.8, 'tempo': 130}
-            }
-        
-        # If model is trained, we could analyze the training data to get actual characteristics
-        # For now, return the default values
-        return self.get_mood_characteristics()
+        """Get the characteristic audio features (centroids) for each mood
+        
+        Computed from the training data when the model was trained; defaults are
+        returned for an untrained model or one saved without mood profiles.
+        """
+        return mood_characteristics(self.mood_profiles)
+    
+    def _load_student(self, model_dir):
+        """Load the distilled student model, if one was saved with this model"""
+        student_path = os.path.join(model_dir, 'student_model.pkl')
+        if os.path.exists(student_path):
+            self.student = joblib.load(student_path)
     
     def save_model(self, model_dir='models'):
         """Save the trained model and preprocessors"""
@@ -165,29 +618,117 @@ class MoodClassifier:
         
         os.makedirs(model_dir, exist_ok=True)
         
-        # Save model components
-        joblib.dump(self.model, os.path.join(model_dir, 'mood_classifier.pkl'))
+        # Save model components (a model loaded from an artifact has no estimator
+        # to pickle, only its flattened forest)
+        if self.model is not None:
+            joblib.dump(self.model, os.path.join(model_dir, 'mood_classifier.pkl'))
         joblib.dump(self.scaler, os.path.join(model_dir, 'scaler.pkl'))
         joblib.dump(self.label_encoder, os.path.join(model_dir, 'label_encoder.pkl'))
+        # A student distilled from an earlier model must not be loaded with this one
+        student_path = os.path.join(model_dir, 'student_model.pkl')
+        if self.student is not None:
+            joblib.dump(self.student, student_path)
+        elif os.path.exists(student_path):
+            os.remove(student_path)
         
         # Save feature columns
         with open(os.path.join(model_dir, 'feature_columns.txt'), 'w') as f:
             f.write('\n'.join(self.feature_columns))
         
+        profiles_path = os.path.join(model_dir, PROFILES_FILENAME)
+        if self.mood_profiles is not None:
+            save_mood_profiles(self.mood_profiles, model_dir)
+        elif os.path.exists(profiles_path):
+            os.remove(profiles_path)
+        
+        # Single-file memory-mappable artifact for tree models, versioned with
+        # the pickle's content hash so both load paths report the same version
+        artifact_path = os.path.join(model_dir, model_artifact.ARTIFACT_FILENAME)
+        if self.model is None or FlatForest.supports(self.model):
+            model_version = self.model_version
+            if self.model is not None:
+                with open(os.path.join(model_dir, 'mood_classifier.pkl'), 'rb') as f:
+                    model_version = hashlib.sha1(f.read()).hexdigest()[:16]
+            forest = self.flat_forest or FlatForest.from_estimator(self.model, self.scaler)
+            model_artifact.save_artifact(forest, artifact_path, {
+                'feature_columns': self.feature_columns,
+                'classes': [str(mood) for mood in self.label_encoder.classes_],
+                'scaler': {
+                    'mean': self.scaler.mean_.tolist(),
+                    'scale': self.scaler.scale_.tolist(),
+                    'var': self.scaler.var_.tolist(),
+                    'n_samples_seen': int(np.max(self.scaler.n_samples_seen_))
+                },
+                'model': {
+                    'estimator': type(self.model).__name__ if self.model is not None else 'FlatForest',
+                    'backend': self.backend,
+                    'n_trees': forest.n_trees,
+                    'n_nodes': forest.n_nodes,
+                    'model_version': model_version
+                },
+                'mood_profiles': self.mood_profiles
+            })
+        elif os.path.exists(artifact_path):
+            # A stale artifact would shadow the pickles on the next load
+            os.remove(artifact_path)
+        
         print(f"Model saved to {model_dir}/")
     
-    def load_model(self, model_dir='models'):
-        """Load a pre-trained model"""
+    def _load_artifact(self, artifact_path):
+        """Load the single-file artifact; the forest stays memory-mapped"""
+        forest, header = model_artifact.load_artifact(artifact_path)
+        
+        scaler = StandardScaler()
+        scaler.mean_ = np.array(header['scaler']['mean'])
+        scaler.scale_ = np.array(header['scaler']['scale'])
+        scaler.var_ = np.array(header['scaler']['var'])
+        scaler.n_samples_seen_ = header['scaler']['n_samples_seen']
+        scaler.n_features_in_ = len(header['feature_columns'])
+        
+        label_encoder = LabelEncoder()
+        label_encoder.classes_ = np.array(header['classes'], dtype=object)
+        
+        self.model = None
+        self.backend = header['model']['backend']
+        self.scaler = scaler
+        self.label_encoder = label_encoder
+        self.feature_columns = header['feature_columns']
+        self._mark_trained(header['model']['model_version'])
+        self.flat_forest = forest
+        self.mood_profiles = header.get('mood_profiles')
+    
+    def load_model(self, model_dir='models', use_artifact=True):
+        """Load a pre-trained model
+        
+        When the directory holds a single-file artifact it is memory-mapped
+        instead of unpickling the model; predictions then run on the FlatForest
+        and self.model is None. use_artifact=False forces the pickles.
+        """
         try:
-            self.model = joblib.load(os.path.join(model_dir, 'mood_classifier.pkl'))
+            artifact_path = os.path.join(model_dir, model_artifact.ARTIFACT_FILENAME)
+            if use_artifact and os.path.exists(artifact_path):
+                self._load_artifact(artifact_path)
+                self._load_student(model_dir)
+                print(f"Model loaded from {model_dir}/")
+                return True
+            
+            model_path = os.path.join(model_dir, 'mood_classifier.pkl')
+            self.model = joblib.load(model_path)
             self.scaler = joblib.load(os.path.join(model_dir, 'scaler.pkl'))
             self.label_encoder = joblib.load(os.path.join(model_dir, 'label_encoder.pkl'))
+            # The pickles do not record the backend; retraining a loaded model uses it
+            self.backend = backend_of(self.model) or self.backend
             
             # Load feature columns
             with open(os.path.join(model_dir, 'feature_columns.txt'), 'r') as f:
                 self.feature_columns = [line.strip() for line in f.readlines()]
             
-            self.is_trained = True
+            # Content hash, so every process loading the same model agrees on its version
+            with open(model_path, 'rb') as f:
+                self._mark_trained(hashlib.sha1(f.read()).hexdigest()[:16])
+            self.mood_profiles = load_mood_profiles(model_dir)
+            
+            self._load_student(model_dir)
             print(f"Model loaded from {model_dir}/")
             return True
         except Exception as e:
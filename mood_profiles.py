@@ -0,0 +1,82 @@
+import json
+import os
+
+import numpy as np
+
+PROFILES_FILENAME = 'mood_profiles.json'
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+TARGET_FEATURES = ('valence', 'energy', 'tempo')
+
+# Used until a model has been trained on real data
+DEFAULT_MOOD_CHARACTERISTICS = {
+    'Happy': {'valence': 0.8, 'energy': 0.7, 'danceability': 0.7, 'tempo': 120},
+    'Sad': {'valence': 0.2, 'energy': 0.3, 'danceability': 0.4, 'tempo': 80},
+    'Angry': {'valence': 0.3, 'energy': 0.9, 'danceability': 0.5, 'tempo': 140},
+    'Calm': {'valence': 0.5, 'energy': 0.2, 'danceability': 0.3, 'tempo': 70},
+    'Energetic': {'valence': 0.7, 'energy': 0.9, 'danceability': 0.8, 'tempo': 130}
+}
+
+def compute_mood_profiles(X, labels, classes, feature_columns, quantiles=QUANTILES):
+    """Per-mood centroid, quantiles and covariance of raw training features
+
+    X is an (n_tracks, n_features) array in feature_columns order and labels
+    holds each row's index into classes. Rows are grouped with one stable sort,
+    so every statistic is computed on a contiguous slice. Returns a
+    JSON-serializable dict.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    labels = np.asarray(labels)
+    order = np.argsort(labels, kind='stable')
+    X, labels = X[order], labels[order]
+    bounds = np.searchsorted(labels, np.arange(len(classes) + 1))
+
+    moods = {}
+    for i, mood in enumerate(classes):
+        group = X[bounds[i]:bounds[i + 1]]
+        if len(group) == 0:
+            continue
+        mean = group.mean(axis=0)
+        values = np.quantile(group, quantiles, axis=0)
+        covariance = np.cov(group, rowvar=False) if len(group) > 1 else np.zeros((X.shape[1], X.shape[1]))
+        moods[str(mood)] = {
+            'count': int(len(group)),
+            'mean': dict(zip(feature_columns, mean.tolist())),
+            'quantiles': {feature: values[:, j].tolist() for j, feature in enumerate(feature_columns)},
+            'covariance': np.atleast_2d(covariance).tolist()
+        }
+    return {'feature_columns': list(feature_columns), 'quantiles': list(quantiles), 'moods': moods}
+
+def save_mood_profiles(profiles, model_dir='models'):
+    with open(os.path.join(model_dir, PROFILES_FILENAME), 'w') as f:
+        json.dump(profiles, f, indent=2)
+
+def load_mood_profiles(model_dir='models'):
+    """Mood profiles saved with a model, or None if there are none"""
+    path = os.path.join(model_dir, PROFILES_FILENAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def mood_characteristics(profiles=None, features=('valence', 'energy', 'danceability', 'tempo')):
+    """{mood: {feature: centroid value}}, falling back to the defaults without profiles"""
+    if not profiles:
+        return {
+            mood: {feature: values[feature] for feature in features if feature in values}
+            for mood, values in DEFAULT_MOOD_CHARACTERISTICS.items()
+        }
+    return {
+        mood: {feature: profile['mean'][feature] for feature in features if feature in profile['mean']}
+        for mood, profile in profiles['moods'].items()
+    }
+
+def recommendation_targets(mood, profiles=None):
+    """target_valence/target_energy/target_tempo for a mood, or None for an unknown mood
+
+    Moods missing from the profiles fall back to the defaults.
+    """
+    profile = profiles['moods'].get(mood) if profiles else None
+    values = profile['mean'] if profile else DEFAULT_MOOD_CHARACTERISTICS.get(mood)
+    if values is None:
+        return None
+    return {f'target_{feature}': values[feature] for feature in TARGET_FEATURES if feature in values}
@@ -0,0 +1,93 @@
+import numpy as np
+
+PLAYLIST_FEATURES = ('valence', 'energy', 'danceability', 'tempo')
+
+def mmr_rerank(features, relevance, k, diversity=0.3, artists=None, max_per_artist=2):
+    """Pick k candidate indices by maximal marginal relevance
+
+    Each step picks the candidate maximizing
+    (1 - diversity) * relevance + diversity * distance to the nearest picked track,
+    with both terms scaled to [0, 1]. Distances to the picked set are kept as a
+    running minimum, so each step costs one O(n_candidates * n_features) update.
+    artists (one label per candidate) with max_per_artist limits how many tracks
+    of one artist are picked; None disables the cap.
+    """
+    features = np.asarray(features, dtype=np.float64)
+    relevance = np.asarray(relevance, dtype=np.float64)
+    n = len(features)
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    spread = relevance.max() - relevance.min()
+    relevance = (relevance - relevance.min()) / spread if spread > 0 else np.ones(n)
+
+    # Unavailable candidates get -inf relevance and zero novelty, so no
+    # boolean masking is needed inside the loop
+    weighted_relevance = (1 - diversity) * relevance
+    if artists is not None and max_per_artist is not None:
+        _, artist_codes = np.unique(np.asarray(artists, dtype=str), return_inverse=True)
+        artist_counts = np.zeros(artist_codes.max() + 1, dtype=np.int64)
+    else:
+        artist_codes = None
+
+    squared_norms = np.einsum('ij,ij->i', features, features)
+    nearest_picked = np.full(n, np.inf)
+    scores, distances = relevance.copy(), np.empty(n)
+    picked = []
+    for _ in range(k):
+        if picked:
+            largest = nearest_picked.max()
+            np.multiply(nearest_picked, diversity / largest if largest > 0 else 0.0, out=scores)
+            scores += weighted_relevance
+        choice = int(np.argmax(scores))
+        if scores[choice] == -np.inf:
+            break
+        picked.append(choice)
+
+        # |a - b|^2 = |a|^2 + |b|^2 - 2 a.b, reusing the precomputed norms
+        np.dot(features, features[choice], out=distances)
+        distances *= -2
+        distances += squared_norms + squared_norms[choice]
+        np.sqrt(np.maximum(distances, 0, out=distances), out=distances)
+        np.minimum(nearest_picked, distances, out=nearest_picked)
+
+        removed = [choice]
+        if artist_codes is not None:
+            code = artist_codes[choice]
+            artist_counts[code] += 1
+            if artist_counts[code] >= max_per_artist:
+                removed = artist_codes == code
+        weighted_relevance[removed] = -np.inf
+        nearest_picked[removed] = 0.0
+    return np.array(picked, dtype=np.int64)
+
+def assemble_playlist(tracks, k=20, target=None, diversity=0.3, max_per_artist=2,
+                      feature_columns=PLAYLIST_FEATURES):
+    """Re-rank candidate track dicts into a diverse playlist of at most k tracks
+
+    Relevance is closeness to target (a feature dict) when given, otherwise the
+    candidates' incoming order. Features are standardized over the candidate
+    pool; missing values use the pool mean.
+    """
+    if not tracks:
+        return []
+    features = np.array([[track.get(column, np.nan) for column in feature_columns] for track in tracks],
+                        dtype=np.float64)
+    means = np.nanmean(np.where(np.isnan(features).all(axis=0), 0.0, features), axis=0)
+    features = np.where(np.isnan(features), means, features)
+    scales = features.std(axis=0)
+    scales[scales == 0] = 1.0
+    features = (features - means) / scales
+
+    if target is not None:
+        target_vector = np.array([target.get(column, means[j]) for j, column in enumerate(feature_columns)],
+                                 dtype=np.float64)
+        relevance = -np.linalg.norm(features - (target_vector - means) / scales, axis=1)
+    else:
+        relevance = -np.arange(len(tracks), dtype=np.float64)
+
+    # Tracks without an artist are never capped together
+    artists = [track.get('artist') or f'\0{i}' for i, track in enumerate(tracks)]
+    order = mmr_rerank(features, relevance, k, diversity, artists, max_per_artist)
+    return [tracks[i] for i in order]
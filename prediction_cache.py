@@ -0,0 +1,153 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+def _copy_result(result):
+    """Copy of a cached result, so callers cannot modify the cached entry"""
+    return dict(result, all_probabilities=dict(result['all_probabilities']))
+
+class PredictionCache:
+    """LRU cache of MoodClassifier.predict_mood results
+
+    Entries are keyed by (model_version, track_id) when a track ID is known
+    (passed explicitly or found under 'id'/'track_id' in the features) and by
+    (model_version, hash of the feature vector) otherwise. Whenever the wrapped
+    classifier reports a different model_version (it was retrained or another
+    model was loaded) the cache is cleared. With a path, results are also
+    written through to a SQLite file so they survive restarts. Every call
+    returns a new dict; other attributes are read from the wrapped classifier.
+    """
+    def __init__(self, classifier, maxsize=10000, path=None, commit_every=100):
+        self.classifier = classifier
+        self.maxsize = maxsize
+        self.commit_every = commit_every
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = classifier.model_version
+        self._pending_writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "model_version TEXT NOT NULL, key TEXT NOT NULL, result TEXT NOT NULL, "
+                "PRIMARY KEY (model_version, key))"
+            )
+            self._purge_stale_rows()
+
+    def _purge_stale_rows(self):
+        """Drop persisted results of other model versions"""
+        if self._db is not None:
+            self._db.execute("DELETE FROM predictions WHERE model_version != ?", (str(self._version),))
+            self._db.commit()
+
+    def _check_version(self):
+        """Invalidate everything if the classifier's model changed"""
+        if self.classifier.model_version != self._version:
+            self._version = self.classifier.model_version
+            self._entries.clear()
+            self._purge_stale_rows()
+
+    def _key(self, audio_features, track_id):
+        """Cache key for one track"""
+        if track_id is None:
+            track_id = audio_features.get('track_id') or audio_features.get('id')
+        if track_id is not None:
+            return f"id:{track_id}"
+        vector = np.array(
+            [audio_features.get(column, np.nan) for column in self.classifier.feature_columns],
+            dtype=np.float64
+        )
+        return "fv:" + hashlib.blake2b(vector.tobytes(), digest_size=16).hexdigest()
+
+    def predict_mood(self, audio_features, track_id=None):
+        """Cached equivalent of MoodClassifier.predict_mood for a single track dict"""
+        with self._lock:
+            self._check_version()
+            key = self._key(audio_features, track_id)
+
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy_result(result)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT result FROM predictions WHERE model_version = ? AND key = ?",
+                    (str(self._version), key)
+                ).fetchone()
+                if row is not None:
+                    result = json.loads(row[0])
+                    self._store(key, result)
+                    self.hits += 1
+                    return _copy_result(result)
+
+            self.misses += 1
+            result = self.classifier.predict_mood(audio_features)
+            result = {
+                'predicted_mood': str(result['predicted_mood']),
+                'confidence': float(result['confidence']),
+                'all_probabilities': {str(k): float(v) for k, v in result['all_probabilities'].items()}
+            }
+            self._store(key, result)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?)",
+                    (str(self._version), key, json.dumps(result))
+                )
+                self._pending_writes += 1
+                if self._pending_writes >= self.commit_every:
+                    self._db.commit()
+                    self._pending_writes = 0
+            return _copy_result(result)
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the cache itself
+        if name == 'classifier':
+            raise AttributeError(name)
+        return getattr(self.classifier, name)
+
+    def _store(self, key, result):
+        """Insert into the in-memory LRU, evicting the least recently used entry"""
+        self._entries[key] = result
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """Hit-rate statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'model_version': self._version
+        }
+
+    def clear(self):
+        """Drop all cached results, including persisted ones"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM predictions")
+                self._db.commit()
+
+    def close(self):
+        """Flush pending writes and close the backing file"""
+        with self._lock:
+            if self._db is not None:
+                self._db.commit()
+                self._db.close()
+                self._db = None
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Quantized compact representation of the MoodClassifier forest
+Exports the trained forest with per-feature bucketed thresholds, narrow node
+indices and uint8 leaf probabilities, and reports the accuracy lost against
+the original model
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from forest_engine import FlatForest
+
+def _narrowest_uint(max_value):
+    """Smallest unsigned integer dtype that can hold max_value"""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+class QuantizedForest:
+    """Compact forest that predicts directly from its quantized arrays
+
+    Every split threshold is replaced by its index into a sorted per-feature
+    table of distinct thresholds (uint8 while every feature has at most 256 of
+    them, else uint16). Inputs are bucketed once per row with searchsorted, after which
+    x <= table[k] becomes the integer test bucket <= k. Tables are stored as
+    float32, node and leaf indices use the narrowest unsigned type that fits,
+    and leaf probabilities are stored as uint8 (probability * 255).
+    """
+    def __init__(self, feature, threshold_index, left, right, leaf_index, leaf_values,
+                 roots, max_depth, tables, impute_values):
+        self.feature = feature
+        self.threshold_index = threshold_index
+        self.left = left
+        self.right = right
+        self.leaf_index = leaf_index
+        self.leaf_values = leaf_values
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.tables = tables
+        self.impute_values = impute_values
+
+    @classmethod
+    def from_flat_forest(cls, forest, impute_values, table_dtype=np.float32):
+        """Quantize a FlatForest whose thresholds are in raw feature space"""
+        n_features = len(impute_values)
+        internal = np.isfinite(forest.threshold)
+        tables = []
+        threshold_index = np.zeros(len(forest.feature), dtype=np.int64)
+        for f in range(n_features):
+            nodes = internal & (forest.feature == f)
+            table = np.unique(forest.threshold[nodes].astype(table_dtype))
+            tables.append(table)
+            threshold_index[nodes] = np.searchsorted(table, forest.threshold[nodes].astype(table_dtype))
+        index_dtype = _narrowest_uint(max((len(t) for t in tables), default=1) - 1)
+
+        n_nodes = len(forest.feature)
+        node_dtype = _narrowest_uint(n_nodes - 1)
+        is_leaf = ~internal
+        leaf_index = np.cumsum(is_leaf) - 1
+        leaf_values = np.rint(forest.values[is_leaf] * 255).astype(np.uint8)
+
+        return cls(
+            feature=forest.feature.astype(np.uint8),
+            threshold_index=threshold_index.astype(index_dtype),
+            left=forest.left.astype(node_dtype),
+            right=forest.right.astype(node_dtype),
+            leaf_index=np.where(is_leaf, leaf_index, 0).astype(_narrowest_uint(max(is_leaf.sum() - 1, 0))),
+            leaf_values=leaf_values,
+            roots=forest.roots.astype(node_dtype),
+            max_depth=forest.max_depth,
+            tables=tables,
+            impute_values=np.asarray(impute_values, dtype=np.float64)
+        )
+
+    @classmethod
+    def from_classifier(cls, classifier):
+        """Quantize a trained MoodClassifier's forest"""
+        forest = classifier.flat_forest
+        if forest is None:
+            forest = FlatForest.from_estimator(classifier.model, classifier.scaler)
+        return cls.from_flat_forest(forest, classifier.scaler.mean_)
+
+    def nbytes(self):
+        """Total size of the quantized arrays in bytes"""
+        arrays = [self.feature, self.threshold_index, self.left, self.right,
+                  self.leaf_index, self.leaf_values, self.roots] + self.tables
+        return sum(array.nbytes for array in arrays)
+
+    def bucketize(self, X):
+        """Per-feature bucket codes of raw features, shape (n_rows, n_features)"""
+        X = np.asarray(X, dtype=np.float64)
+        missing = np.isnan(X)
+        if missing.any():
+            X = np.where(missing, self.impute_values, X)
+        codes = np.empty(X.shape, dtype=np.int64)
+        for f, table in enumerate(self.tables):
+            codes[:, f] = np.searchsorted(table, X[:, f].astype(table.dtype), side='left')
+        return codes
+
+    def predict_proba(self, X):
+        """Class probabilities for raw features, shape (n_rows, n_classes)"""
+        codes = self.bucketize(X)
+        # Widen the narrow arrays once per call rather than on every gather
+        arrays = (self.feature.astype(np.intp), self.threshold_index.astype(np.int64),
+                  self.left.astype(np.intp), self.right.astype(np.intp))
+        totals = np.empty((len(codes), self.leaf_values.shape[1]), dtype=np.float64)
+        for start in range(0, len(codes), FlatForest.block_size):
+            block = codes[start:start + FlatForest.block_size]
+            totals[start:start + len(block)] = self._leaf_totals(block, *arrays)
+        # uint8 rounding means leaf rows need not sum to exactly 255
+        return totals / totals.sum(axis=1, keepdims=True)
+
+    def _leaf_totals(self, codes, feature, threshold_index, left, right):
+        n_rows, n_features = codes.shape
+        flat_codes = codes.ravel()
+        row_offsets = np.arange(n_rows) * n_features
+        node = np.repeat(self.roots.astype(np.intp)[:, np.newaxis], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            goes_left = flat_codes[feature[node] + row_offsets] <= threshold_index[node]
+            node = np.where(goes_left, left[node], right[node])
+        return self.leaf_values[self.leaf_index[node]].sum(axis=0, dtype=np.float64)
+
+    def predict(self, X):
+        """Index of the most probable class for each row"""
+        return np.argmax(self.predict_proba(X), axis=1)
+
+    def save(self, path, metadata=None):
+        """Save to an uncompressed .npz file (no pickles)"""
+        arrays = {
+            'feature': self.feature, 'threshold_index': self.threshold_index,
+            'left': self.left, 'right': self.right, 'leaf_index': self.leaf_index,
+            'leaf_values': self.leaf_values, 'roots': self.roots,
+            'impute_values': self.impute_values,
+            'max_depth': np.array(self.max_depth),
+            'metadata': np.array(json.dumps(metadata or {}))
+        }
+        for f, table in enumerate(self.tables):
+            arrays[f'table_{f}'] = table
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Load a quantized forest; returns (QuantizedForest, metadata)"""
+        with np.load(path, allow_pickle=False) as data:
+            n_features = len(data['impute_values'])
+            forest = cls(
+                data['feature'], data['threshold_index'], data['left'], data['right'],
+                data['leaf_index'], data['leaf_values'], data['roots'], int(data['max_depth']),
+                [data[f'table_{f}'] for f in range(n_features)], data['impute_values']
+            )
+            metadata = json.loads(str(data['metadata']))
+        return forest, metadata
+
+def quantization_report(classifier, quantized, X, y=None):
+    """Compare quantized predictions with the original model on raw features X
+
+    y, if given, holds the true label indices.
+    """
+    reference = classifier.predict_batch(X)[2]
+    quantized_proba = quantized.predict_proba(X)
+    reference_labels = np.argmax(reference, axis=1)
+    quantized_labels = np.argmax(quantized_proba, axis=1)
+    original = classifier.flat_forest
+    if original is None:
+        original = FlatForest.from_estimator(classifier.model, classifier.scaler)
+    report = {
+        'rows': len(X),
+        'agreement': float(np.mean(reference_labels == quantized_labels)),
+        'max_abs_prob_diff': float(np.max(np.abs(reference - quantized_proba))),
+        'mean_abs_prob_diff': float(np.mean(np.abs(reference - quantized_proba))),
+        'original_bytes': int(sum(getattr(original, name).nbytes for name in
+                                  ('feature', 'threshold', 'left', 'right', 'values', 'roots'))),
+        'quantized_bytes': int(quantized.nbytes())
+    }
+    if y is not None:
+        report['original_accuracy'] = float(np.mean(reference_labels == y))
+        report['quantized_accuracy'] = float(np.mean(quantized_labels == y))
+        report['accuracy_loss'] = report['original_accuracy'] - report['quantized_accuracy']
+    return report
+
+def main():
+    """Export a quantized forest and report its accuracy loss"""
+    import pandas as pd
+    from mood_classifier import MoodClassifier
+
+    parser = argparse.ArgumentParser(description="Export a quantized MoodClassifier forest")
+    parser.add_argument('--model-dir', default='models', help="Saved model directory")
+    parser.add_argument('--data', default='data/mood_music_dataset.csv', help="Dataset for the accuracy report")
+    parser.add_argument('--output', default='models/mood_classifier_quantized.npz', help="Output .npz file")
+    args = parser.parse_args()
+
+    classifier = MoodClassifier()
+    if not classifier.load_model(args.model_dir):
+        raise SystemExit(1)
+
+    quantized = QuantizedForest.from_classifier(classifier)
+    quantized.save(args.output, {
+        'feature_columns': classifier.feature_columns,
+        'classes': [str(mood) for mood in classifier.label_encoder.classes_],
+        'model_version': classifier.model_version
+    })
+    print(f"Quantized forest saved to {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB)")
+
+    if os.path.exists(args.data):
+        df = pd.read_csv(args.data).dropna(subset=classifier.feature_columns + ['mood'])
+        X = df[classifier.feature_columns].to_numpy(dtype=np.float64)
+        y = np.searchsorted(classifier.label_encoder.classes_, df['mood'].to_numpy())
+        report = quantization_report(classifier, quantized, X, y)
+        print("\nQuantization Report:")
+        for key, value in report.items():
+            print(f"  {key}: {value:.4f}" if isinstance(value, float) else f"  {key}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Score a catalog file of tracks with the trained mood classifier
+Streams a CSV or Parquet file in fixed-size chunks so memory stays bounded,
+and writes predicted_mood, confidence and per-class probabilities per track
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from bulk_scoring import BulkScorer
+from mood_classifier import MoodClassifier
+
+def _is_parquet(path):
+    return path.lower().endswith(('.parquet', '.pq'))
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet files need pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+def read_column_names(path):
+    """Column names of a CSV or Parquet file, without reading its rows"""
+    if _is_parquet(path):
+        pyarrow = _import_pyarrow()
+        return list(pyarrow.parquet.ParquetFile(path).schema_arrow.names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+def read_chunks(path, columns, chunksize):
+    """Yield DataFrames of at most chunksize rows holding only the given columns"""
+    if _is_parquet(path):
+        pyarrow = _import_pyarrow()
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet output file"""
+    def __init__(self, path):
+        self.path = path
+        self._parquet_writer = None
+        self._wrote_header = False
+
+    def write(self, df):
+        if _is_parquet(self.path):
+            pyarrow = _import_pyarrow()
+            table = pyarrow.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode='a' if self._wrote_header else 'w',
+                      header=not self._wrote_header, index=False)
+            self._wrote_header = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+def score_chunk(chunk, classes, feature_columns, keep_columns, predict):
+    """Scored DataFrame for one input chunk; predict maps features to predict_batch output"""
+    features = chunk[feature_columns].to_numpy(dtype=np.float64)
+    label_indices, confidences, probabilities = predict(features)
+    scored = chunk[list(keep_columns)].reset_index(drop=True)
+    scored['predicted_mood'] = classes[label_indices]
+    scored['confidence'] = confidences
+    for i, mood in enumerate(classes):
+        scored[f'prob_{mood}'] = probabilities[:, i]
+    return scored
+
+def score_catalog(input_path, output_path, classifier, chunksize=100000, keep_columns=(),
+                  n_workers=1, model_dir='models'):
+    """Score input_path chunk by chunk into output_path; returns (rows, seconds)
+
+    keep_columns are copied from the input to the output (e.g. track IDs).
+    n_workers > 1 spreads each chunk over a BulkScorer process pool; where
+    workers are spawned rather than forked they load the model from model_dir,
+    which must hold the same model as classifier.
+    """
+    feature_columns = classifier.feature_columns
+    columns = list(keep_columns) + [c for c in feature_columns if c not in keep_columns]
+    classes = classifier.label_encoder.classes_
+
+    scorer = BulkScorer(classifier, model_dir=model_dir, n_workers=n_workers) if n_workers > 1 else None
+    predict = scorer.score if scorer is not None else classifier.predict_batch
+    writer = ChunkWriter(output_path)
+    rows = 0
+    start = time.perf_counter()
+    try:
+        for chunk in read_chunks(input_path, columns, chunksize):
+            scored = score_chunk(chunk, classes, feature_columns, keep_columns, predict)
+            writer.write(scored)
+            rows += len(chunk)
+            elapsed = time.perf_counter() - start
+            print(f"Scored {rows:,} rows ({rows / elapsed:,.0f} rows/s)", flush=True)
+    finally:
+        writer.close()
+        if scorer is not None:
+            scorer.close()
+    return rows, time.perf_counter() - start
+
+def main():
+    """Score a catalog file with the saved model"""
+    parser = argparse.ArgumentParser(description="Label a catalog of tracks with predicted moods")
+    parser.add_argument('input', help="Input CSV or Parquet file with the model's feature columns")
+    parser.add_argument('output', help="Output CSV or Parquet file (format chosen by extension)")
+    parser.add_argument('--model-dir', default='models', help="Saved model directory")
+    parser.add_argument('--chunksize', type=int, default=100000, help="Rows read and scored at a time")
+    parser.add_argument('--keep-columns', nargs='*', default=[],
+                        help="Input columns to copy to the output, e.g. track_id track_name artist")
+    parser.add_argument('--workers', type=int, default=1, help="Scoring processes per chunk")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"Input file not found: {args.input}")
+        return
+
+    classifier = MoodClassifier()
+    if not classifier.load_model(args.model_dir):
+        print("Please run 'python train_model.py' first to train the model.")
+        return
+
+    try:
+        rows, elapsed = score_catalog(args.input, args.output, classifier, args.chunksize,
+                                      args.keep_columns, args.workers, model_dir=args.model_dir)
+    except ImportError as e:
+        print(e)
+        return
+    print(f"\nScored {rows:,} tracks in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import pandas as pd
 import time
 import random
 from spotify_client import SpotifyClient
+from track_catalog import TrackCatalog
 import os
 
 class SimpleDataCollector:
@@ -96,8 +97,8 @@ class SimpleDataCollector:
         
         return all_data
     
-    def save_data(self, data, filename='mood_music_data.csv'):
-        """Save collected data to CSV"""
+    def save_data(self, data, filename='mood_music_data.csv', catalog_path='data/track_catalog.db'):
+        """Save collected data to CSV and upsert it into the track catalog (unless catalog_path is None)"""
         if not data:
             print("No data to save!")
             return
@@ -111,6 +112,10 @@ class SimpleDataCollector:
         df.to_csv(filepath, index=False)
         
         print(f"\nData saved to {filepath}")
+        if catalog_path:
+            with TrackCatalog(catalog_path) as catalog:
+                catalog.upsert(df)
+            print(f"Track catalog updated: {catalog_path}")
         print(f"Total tracks collected: {len(df)}")
         print(f"Tracks per mood:")
         print(df['mood'].value_counts())
@@ -2,15 +2,27 @@ import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
 import os
 from dotenv import load_dotenv
-import pandas as pd
 import time
 import random
+from mood_profiles import load_mood_profiles, recommendation_targets
 
 load_dotenv()
 
+MOOD_SEED_GENRES = {
+    'Happy': ['pop', 'dance', 'funk'],
+    'Sad': ['indie', 'alternative', 'folk'],
+    'Angry': ['rock', 'metal', 'punk'],
+    'Calm': ['ambient', 'classical', 'chill'],
+    'Energetic': ['electronic', 'house', 'techno']
+}
+
 class SpotifyClient:
-    def __init__(self):
-        """Initialize Spotify client with credentials"""
+    def __init__(self, model_dir='models'):
+        """Initialize Spotify client with credentials
+        
+        Recommendation targets come from the mood profiles saved with the model
+        in model_dir, read once here; defaults are used when there are none.
+        """
         client_id = os.getenv('SPOTIFY_CLIENT_ID')
         client_secret = os.getenv('SPOTIFY_CLIENT_SECRET')
         
@@ -22,6 +34,7 @@ class SpotifyClient:
             client_secret=client_secret
         )
         self.sp = spotipy.Spotify(client_credentials_manager=client_credentials_manager)
+        self.mood_profiles = load_mood_profiles(model_dir)
     
     def get_track_features(self, track_id):
         """Get audio features for a track"""
@@ -32,23 +45,58 @@ class SpotifyClient:
             print(f"Error getting features for track {track_id}: {e}")
             return None
     
+    def get_tracks_features(self, track_ids):
+        """Audio features for many tracks, 100 per API call, aligned with track_ids
+        
+        Tracks without features, or in a failed call, get None.
+        """
+        features = []
+        for start in range(0, len(track_ids), 100):
+            batch = list(track_ids[start:start + 100])
+            try:
+                features.extend(self.sp.audio_features(batch))
+            except Exception as e:
+                print(f"Error getting features for {len(batch)} tracks: {e}")
+                features.extend([None] * len(batch))
+        return features
+    
+    @staticmethod
+    def _track_info(track):
+        """Basic track information from a Spotify track object"""
+        return {
+            'id': track['id'],
+            'name': track['name'],
+            'artist': track['artists'][0]['name'],
+            'album': track['album']['name'],
+            'image_url': track['album']['images'][0]['url'] if track['album']['images'] else None,
+            'preview_url': track['preview_url'],
+            'popularity': track['popularity']
+        }
+    
     def get_track_info(self, track_id):
         """Get basic track information"""
         try:
-            track = self.sp.track(track_id)
-            return {
-                'id': track['id'],
-                'name': track['name'],
-                'artist': track['artists'][0]['name'],
-                'album': track['album']['name'],
-                'image_url': track['album']['images'][0]['url'] if track['album']['images'] else None,
-                'preview_url': track['preview_url'],
-                'popularity': track['popularity']
-            }
+            return self._track_info(self.sp.track(track_id))
         except Exception as e:
             print(f"Error getting track info for {track_id}: {e}")
             return None
     
+    def get_tracks_info(self, track_ids):
+        """Basic information for many tracks, 50 per API call, aligned with track_ids
+        
+        Unknown tracks, or tracks in a failed call, get None.
+        """
+        infos = []
+        for start in range(0, len(track_ids), 50):
+            batch = list(track_ids[start:start + 50])
+            try:
+                tracks = self.sp.tracks(batch)['tracks']
+                infos.extend(self._track_info(track) if track else None for track in tracks)
+            except Exception as e:
+                print(f"Error getting track info for {len(batch)} tracks: {e}")
+                infos.extend([None] * len(batch))
+        return infos
+    
     def search_tracks_by_genre(self, genre, limit=50):
         """Search for tracks by genre"""
         try:
@@ -96,48 +144,14 @@ class SpotifyClient:
             return []
     
     def get_mood_based_recommendations(self, mood, limit=20):
-        """Get recommendations based on mood with predefined parameters"""
-        mood_params = {
-            'Happy': {
-                'target_valence': 0.8,
-                'target_energy': 0.7,
-                'target_tempo': 120,
-                'seed_genres': ['pop', 'dance', 'funk']
-            },
-            'Sad': {
-                'target_valence': 0.2,
-                'target_energy': 0.3,
-                'target_tempo': 80,
-                'seed_genres': ['indie', 'alternative', 'folk']
-            },
-            'Angry': {
-                'target_valence': 0.3,
-                'target_energy': 0.9,
-                'target_tempo': 140,
-                'seed_genres': ['rock', 'metal', 'punk']
-            },
-            'Calm': {
-                'target_valence': 0.5,
-                'target_energy': 0.2,
-                'target_tempo': 70,
-                'seed_genres': ['ambient', 'classical', 'chill']
-            },
-            'Energetic': {
-                'target_valence': 0.7,
-                'target_energy': 0.9,
-                'target_tempo': 130,
-                'seed_genres': ['electronic', 'house', 'techno']
-            }
-        }
-        
-        if mood not in mood_params:
+        """Get recommendations based on mood, targeting the mood's profile"""
+        targets = recommendation_targets(mood, self.mood_profiles)
+        if targets is None or mood not in MOOD_SEED_GENRES:
             mood = 'Happy'  # Default mood
+            targets = recommendation_targets(mood, self.mood_profiles)
         
-        params = mood_params[mood]
         return self.get_recommendations(
-            seed_genres=params['seed_genres'][:3],  # Spotify allows max 5 seeds total
-            target_valence=params['target_valence'],
-            target_energy=params['target_energy'],
-            target_tempo=params['target_tempo'],
-            limit=limit
+            seed_genres=MOOD_SEED_GENRES[mood][:3],  # Spotify allows max 5 seeds total
+            limit=limit,
+            **targets
         )
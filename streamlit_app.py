@@ -1,12 +1,12 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from spotify_client import SpotifyClient
-from mood_classifier import MoodClassifier
+from model_loader import (BackgroundLoader, create_track_source, load_candidate_lists, load_classifier,
+                          model_available)
 import os
 import time
 
+# pandas, plotly, spotipy and scikit-learn are imported on first use so the
+# mood selection screen renders without waiting for them
+
 # Page configuration
 st.set_page_config(
     page_title="Moodify - Emotion-Based Playlist Generator",
@@ -81,6 +81,16 @@ def init_session_state():
     if 'favorites' not in st.session_state:
         st.session_state.favorites = []
 
+def get_taste_profile():
+    """The session's taste profile, built from its favorites on first use"""
+    if 'taste_profile' not in st.session_state:
+        from taste_profile import TasteProfile
+        profile = TasteProfile()
+        for track in st.session_state.favorites:
+            profile.add(track)
+        st.session_state.taste_profile = profile
+    return st.session_state.taste_profile
+
 # Mood configuration
 MOODS = {
     'Happy': {'emoji': '😊', 'color': '#FFD700', 'description': 'Upbeat and joyful music'},
@@ -92,9 +102,9 @@ MOODS = {
 
 @st.cache_resource
 def load_spotify_client():
-    """Load Spotify client with caching"""
+    """Load the track source (Spotify client or local recommender) with caching"""
     try:
-        return SpotifyClient()
+        return create_track_source()
     except Exception as e:
         st.error(f"Failed to initialize Spotify client: {e}")
         st.info("Please check your .env file and ensure Spotify credentials are set correctly.")
@@ -102,13 +112,21 @@ def load_spotify_client():
 
 @st.cache_resource
 def load_mood_classifier():
-    """Load mood classifier with caching"""
-    classifier = MoodClassifier()
-    if os.path.exists('models/mood_classifier.pkl'):
-        classifier.load_model()
-        return classifier
-    else:
+    """Start loading the mood classifier in the background, once per server process
+    
+    Returns a BackgroundLoader; call .result() where the classifier is needed.
+    """
+    if not os.getenv('MOODIFY_INFERENCE_URL') and not model_available():
         st.warning("Mood classifier model not found. Using default recommendations.")
+    return BackgroundLoader(load_classifier)
+
+@st.cache_resource
+def load_candidates():
+    """Memory-map the precomputed per-mood candidate lists once, or None if not built"""
+    try:
+        return load_candidate_lists()
+    except Exception as e:
+        st.warning(f"Could not load precomputed candidate lists: {e}")
         return None
 
 def display_mood_selector():
@@ -128,28 +146,60 @@ def display_mood_selector():
                 st.session_state.selected_mood = mood
                 st.rerun()
 
-def get_recommendations(mood, spotify_client, limit=20):
-    """Get music recommendations for selected mood"""
+def get_recommendations(mood, spotify_client, limit=20, pool_size=60, dj_order=None):
+    """Get music recommendations for selected mood
+    
+    A pool of pool_size candidates is re-ranked into a diverse playlist of
+    limit tracks with at most two tracks per artist. The pool comes from the
+    precomputed candidate lists when they exist, which also carry each
+    track's audio features and display info, and is first reordered by the
+    session's taste profile once there are favorites. With DJ ordering (the
+    sidebar toggle by default) the playlist is then sequenced by tempo and key.
+    """
+    from playlist_assembly import assemble_playlist
+    
     try:
-        # Get recommendations from Spotify
-        track_ids = spotify_client.get_mood_based_recommendations(mood, limit=limit)
+        # Get a candidate pool from the track source (the API allows at most 100)
+        pool_size = min(max(pool_size, limit), 100)
+        candidates = load_candidates()
+        pool = candidates.sample_tracks(mood, pool_size) if candidates is not None and mood in candidates.moods else []
         
-        recommendations = []
-        for track_id in track_ids:
-            track_info = spotify_client.get_track_info(track_id)
-            if track_info:
-                # Get audio features for additional info
-                features = spotify_client.get_track_features(track_id)
-                if features:
-                    track_info.update({
-                        'valence': features['valence'],
-                        'energy': features['energy'],
-                        'danceability': features['danceability'],
-                        'tempo': features['tempo']
-                    })
-                recommendations.append(track_info)
+        if pool and candidates.info_columns:
+            # The lists carry display info and features, so no lookups are needed
+            recommendations = pool
+        else:
+            candidate_features = {track['track_id']: track for track in pool}
+            track_ids = list(candidate_features) or spotify_client.get_mood_based_recommendations(mood, limit=pool_size)
+            
+            # Batched lookups: a few API calls for the whole pool instead of two per track
+            infos = spotify_client.get_tracks_info(track_ids)
+            missing = [track_id for track_id in track_ids if track_id not in candidate_features]
+            fetched = dict(zip(missing, spotify_client.get_tracks_features(missing))) if missing else {}
+            
+            recommendations = []
+            for track_id, track_info in zip(track_ids, infos):
+                if track_info:
+                    # Get audio features for additional info
+                    features = candidate_features.get(track_id) or fetched.get(track_id)
+                    if features:
+                        track_info.update({
+                            'valence': features['valence'],
+                            'energy': features['energy'],
+                            'danceability': features['danceability'],
+                            'tempo': features['tempo']
+                        })
+                        # Key and mode are only in Spotify's audio features
+                        track_info.update({key: features[key] for key in ('key', 'mode') if key in features})
+                    recommendations.append(track_info)
         
-        return recommendations
+        recommendations = get_taste_profile().rerank(recommendations)
+        playlist = assemble_playlist(recommendations, k=limit)
+        if dj_order is None:
+            dj_order = st.session_state.get('dj_order', False)
+        if dj_order:
+            from track_sequencer import sequence_tracks
+            playlist = sequence_tracks(playlist)
+        return playlist
     except Exception as e:
         st.error(f"Error getting recommendations: {e}")
         return []
@@ -205,6 +255,7 @@ def display_recommendations(mood, recommendations):
                 # Favorite button
                 if st.button("❤️", key=f"fav_{i}", help="Add to favorites"):
                     if track not in st.session_state.favorites:
+                        get_taste_profile().add(track)
                         st.session_state.favorites.append(track)
                         st.success("Added to favorites!")
                     else:
@@ -232,6 +283,10 @@ def display_analytics(recommendations):
             })
     
     if features_data:
+        import pandas as pd
+        import plotly.express as px
+        import plotly.graph_objects as go
+        
         df = pd.DataFrame(features_data)
         
         # Create visualizations
@@ -278,7 +333,7 @@ def display_favorites():
         
         with col3:
             if st.button("🗑️", key=f"remove_{i}", help="Remove from favorites"):
-                st.session_state.favorites.pop(i)
+                get_taste_profile().remove(st.session_state.favorites.pop(i))
                 st.rerun()
 
 def main():
@@ -288,7 +343,7 @@ def main():
     
     # Load clients
     spotify_client = load_spotify_client()
-    mood_classifier = load_mood_classifier()
+    mood_classifier_loader = load_mood_classifier()
     
     if not spotify_client:
         st.stop()
@@ -300,6 +355,8 @@ def main():
         
         # Navigation
         page = st.selectbox("Navigate", ["Mood Selection", "Favorites", "About"])
+        st.checkbox("🎧 DJ ordering", key='dj_order',
+                    help="Order new playlists to minimize tempo jumps and key clashes")
         
         if st.session_state.selected_mood:
             st.markdown(f"**Current Mood:** {st.session_state.selected_mood} {MOODS[st.session_state.selected_mood]['emoji']}")
@@ -0,0 +1,99 @@
+import numpy as np
+
+from playlist_assembly import PLAYLIST_FEATURES
+
+# Per-feature variance assumed before any favorites are seen, so a profile
+# with one or two favorites still scores candidates sensibly
+PRIOR_VARIANCES = {'valence': 0.05, 'energy': 0.05, 'danceability': 0.03, 'tempo': 600.0}
+PRIOR_WEIGHT = 2.0
+
+class TasteProfile:
+    """Running mean and covariance of one user's favorited tracks
+
+    Favorites are folded in with Welford's update, O(d^2) per add or remove for
+    d features, and no favorite is stored. Candidates are scored by their
+    Mahalanobis distance to the mean under the covariance shrunk toward
+    PRIOR_VARIANCES with PRIOR_WEIGHT pseudo-observations.
+    """
+    def __init__(self, feature_columns=PLAYLIST_FEATURES):
+        self.feature_columns = tuple(feature_columns)
+        d = len(self.feature_columns)
+        self.count = 0
+        self.mean = np.zeros(d)
+        self._m2 = np.zeros((d, d))
+        self._prior = np.diag([PRIOR_VARIANCES.get(column, 1.0) for column in self.feature_columns])
+        self._precision = None
+
+    def _vector(self, track):
+        """Feature vector of a track dict, or None if a feature is missing"""
+        values = [track.get(column) for column in self.feature_columns]
+        if any(value is None for value in values):
+            return None
+        return np.asarray(values, dtype=np.float64)
+
+    def add(self, track):
+        """Fold a favorited track dict in; returns False if it lacks features"""
+        x = self._vector(track)
+        if x is None:
+            return False
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += np.outer(delta, x - self.mean)
+        self._precision = None
+        return True
+
+    def remove(self, track):
+        """Take an unfavorited track dict back out, reversing add"""
+        x = self._vector(track)
+        if x is None or self.count == 0:
+            return False
+        if self.count == 1:
+            self.count = 0
+            self.mean[:] = 0.0
+            self._m2[:] = 0.0
+        else:
+            previous = (self.count * self.mean - x) / (self.count - 1)
+            self._m2 -= np.outer(x - previous, x - self.mean)
+            self.mean = previous
+            self.count -= 1
+        self._precision = None
+        return True
+
+    @property
+    def covariance(self):
+        """Shrunk covariance used for scoring"""
+        return (self._m2 + PRIOR_WEIGHT * self._prior) / (max(self.count - 1, 0) + PRIOR_WEIGHT)
+
+    def score(self, features):
+        """Taste score of each row of an (n, d) feature array, higher is closer
+
+        The score is minus half the squared Mahalanobis distance to the mean,
+        computed for all rows at once. The d x d precision matrix is inverted
+        on the first score after an update.
+        """
+        if self._precision is None:
+            self._precision = np.linalg.inv(self.covariance)
+        diff = np.asarray(features, dtype=np.float64) - self.mean
+        return -0.5 * np.einsum('ij,ij->i', diff @ self._precision, diff)
+
+    def rerank(self, tracks, weight=0.5):
+        """Reorder candidate track dicts by incoming rank blended with taste
+
+        Both terms are scaled to [0, 1]; weight is the share given to taste.
+        Tracks without features get the lowest taste score. Without favorites
+        the order is unchanged.
+        """
+        if self.count == 0 or len(tracks) < 2:
+            return list(tracks)
+        vectors = [self._vector(track) for track in tracks]
+        known = np.array([vector is not None for vector in vectors])
+        if not known.any():
+            return list(tracks)
+        taste = np.zeros(len(tracks))
+        scores = self.score(np.array([vector for vector in vectors if vector is not None]))
+        spread = scores.max() - scores.min()
+        taste[known] = (scores - scores.min()) / spread if spread > 0 else 1.0
+        incoming = 1.0 - np.arange(len(tracks)) / (len(tracks) - 1)
+        order = np.argsort(-((1 - weight) * incoming + weight * taste), kind='stable')
+        return [tracks[i] for i in order]
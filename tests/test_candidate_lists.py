@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+from candidate_lists import CANDIDATES_FILENAME, build_candidate_lists
+from demo import generate_synthetic_dataset
+from model_loader import load_candidate_lists
+from mood_classifier import MoodClassifier
+
+def test_lists_carry_display_info_and_reject_other_models(tmp_path):
+    df = generate_synthetic_dataset(500)
+    catalog_path = str(tmp_path / 'catalog.csv')
+    df.to_csv(catalog_path, index=False)
+    model_dir = str(tmp_path)
+
+    classifier = MoodClassifier()
+    classifier.train(df)
+    classifier.save_model(model_dir)
+    classifier.load_model(model_dir)
+    build_candidate_lists(catalog_path, classifier, os.path.join(model_dir, CANDIDATES_FILENAME), per_mood=50)
+
+    candidates = load_candidate_lists(model_dir)
+    tracks = candidates.sample_tracks('Calm', 5)
+    assert len(tracks) == 5
+    by_id = df.set_index('track_id')
+    for track in tracks:
+        assert track['name'] == by_id.at[track['id'], 'track_name']
+        assert track['artist'] == by_id.at[track['id'], 'artist']
+
+    retrained = MoodClassifier(random_state=7)
+    retrained.train(df)
+    retrained.save_model(model_dir)
+    with pytest.raises(ValueError, match="rebuild"):
+        load_candidate_lists(model_dir)
@@ -0,0 +1,36 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from forest_engine import FlatForest
+
+def make_forest(seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(2000, 6))
+    y = (X[:, 0] + X[:, 1] ** 2 + rng.normal(scale=0.5, size=len(X)) > 1).astype(int) + (X[:, 2] > 0.5)
+    # Shallow trees with mixed leaves, so leaf values are fractions such as 3/7
+    forest = RandomForestClassifier(n_estimators=25, max_depth=8, min_samples_leaf=7,
+                                    random_state=seed).fit(X, y)
+    return forest, rng.normal(size=(5000, 6))
+
+def test_predict_proba_is_bit_identical_to_sklearn():
+    estimator, X = make_forest()
+    flat = FlatForest.from_estimator(estimator)
+    for n_rows in (1, 7, 16, 17, 256, 5000):
+        assert np.array_equal(flat.predict_proba(X[:n_rows]), estimator.predict_proba(X[:n_rows]))
+
+def test_apply_matches_sklearn_leaves():
+    estimator, X = make_forest(1)
+    flat = FlatForest.from_estimator(estimator)
+    leaves = flat.apply(X[:300]) - flat.roots[:, np.newaxis]
+    assert np.array_equal(leaves, estimator.apply(X[:300]).T)
+
+def test_weighted_count_leaves_are_normalized_like_sklearn_1_3():
+    estimator, X = make_forest(2)
+    expected = estimator.predict_proba(X[:500])
+    # scikit-learn < 1.4 stores weighted class counts in tree_.value
+    for i, tree in enumerate(estimator.estimators_):
+        tree.tree_.value[:] *= 17.0 + i
+    assert not np.allclose(estimator.estimators_[0].tree_.value.sum(axis=2), 1.0)
+    flat = FlatForest.from_estimator(estimator)
+    assert np.allclose(flat.predict_proba(X[:500]), expected)
+    assert np.allclose(flat.values.sum(axis=1), 1.0)
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from inference_server import InferenceServer, MicroBatcher
+
+class SlowClassifier:
+    """predict_batch stand-in that takes a fixed time per call"""
+    def __init__(self, seconds=0.01):
+        self.seconds = seconds
+
+    def predict_batch(self, features):
+        time.sleep(self.seconds)
+        n = len(features)
+        return np.zeros(n, dtype=np.int64), np.ones(n), np.ones((n, 1))
+
+def test_flooded_batcher_groups_requests():
+    async def flood():
+        batcher = MicroBatcher(SlowClassifier(), max_batch_size=256, max_wait_ms=5.0)
+        batcher.start()
+        results = await asyncio.gather(*(batcher.submit(np.zeros((1, 3))) for _ in range(400)))
+        await batcher.stop()
+        return batcher, results
+
+    batcher, results = asyncio.run(flood())
+    assert len(results) == 400
+    assert batcher.requests == 400
+    assert max(batcher.batch_sizes) > 1
+    assert batcher.metrics()['mean_batch_size'] > 1
+    assert max(batcher.batch_sizes) <= 256
+
+def test_requests_queued_during_a_batch_join_the_next_one():
+    async def staggered():
+        batcher = MicroBatcher(SlowClassifier(0.05), max_batch_size=256, max_wait_ms=1.0)
+        batcher.start()
+        first = asyncio.ensure_future(batcher.submit(np.zeros((1, 3))))
+        await asyncio.sleep(0.01)
+        # These arrive while the first batch is predicting, past its deadline
+        rest = [asyncio.ensure_future(batcher.submit(np.zeros((1, 3)))) for _ in range(50)]
+        await asyncio.gather(first, *rest)
+        await batcher.stop()
+        return batcher
+
+    batcher = asyncio.run(staggered())
+    assert list(batcher.batch_sizes) == [1, 50]
+
+def test_stop_fails_requests_that_were_not_answered():
+    async def stop_while_busy():
+        batcher = MicroBatcher(SlowClassifier(0.2), max_batch_size=1, max_wait_ms=1.0)
+        batcher.start()
+        # The first request is predicting when stop() runs, the second still queued
+        requests = [asyncio.ensure_future(batcher.submit(np.zeros((1, 3)))) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(batcher.stop(), 1)
+        return await asyncio.wait_for(asyncio.gather(*requests, return_exceptions=True), 1)
+
+    results = asyncio.run(stop_while_busy())
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+
+class FailingClassifier:
+    """Classifier stand-in whose predictions fail with an unexpected error"""
+    feature_columns = ['valence', 'energy']
+
+    def predict_batch(self, features):
+        raise RuntimeError("model file was removed")
+
+def test_unexpected_prediction_errors_get_a_500_response():
+    async def request():
+        server = InferenceServer(FailingClassifier())
+        server.batcher.start()
+        listener = await asyncio.start_server(server.handle_connection, '127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        body = json.dumps({'valence': 0.5, 'energy': 0.5}).encode()
+        writer.write(b"POST /predict HTTP/1.1\r\nConnection: close\r\n"
+                     b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        listener.close()
+        await server.batcher.stop()
+        return response
+
+    response = asyncio.run(request())
+    assert response.startswith(b"HTTP/1.1 500")
+    assert b"model file was removed" in response
@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from demo import generate_synthetic_dataset
+from mood_classifier import MoodClassifier
+
+def test_saving_without_a_student_removes_a_stale_one(tmp_path):
+    df = generate_synthetic_dataset(500)
+    model_dir = str(tmp_path)
+
+    classifier = MoodClassifier()
+    classifier.train(df)
+    classifier.distill(df)
+    classifier.save_model(model_dir)
+    assert os.path.exists(os.path.join(model_dir, 'student_model.pkl'))
+
+    retrained = MoodClassifier()
+    retrained.train(df)
+    retrained.save_model(model_dir)
+    assert not os.path.exists(os.path.join(model_dir, 'student_model.pkl'))
+
+    loaded = MoodClassifier()
+    assert loaded.load_model(model_dir)
+    assert loaded.student is None
+
+def test_out_of_core_training_does_not_depend_on_file_order(tmp_path):
+    # The collectors write the dataset grouped by mood
+    path = str(tmp_path / 'sorted.csv')
+    generate_synthetic_dataset(4000).sort_values('mood').to_csv(path, index=False)
+
+    classifier = MoodClassifier(backend='sgd')
+    _, small_chunks = classifier.train_out_of_core(path, chunksize=200)
+    _, whole_file = MoodClassifier(backend='sgd').train_out_of_core(path, chunksize=10000)
+    assert small_chunks > 0.9
+    assert abs(small_chunks - whole_file) < 0.05
+
+def test_out_of_core_training_with_many_small_chunks_stays_under_the_open_file_limit(tmp_path):
+    resource = pytest.importorskip('resource')
+    path = str(tmp_path / 'dataset.csv')
+    generate_synthetic_dataset(3000).to_csv(path, index=False)
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(64, hard), hard))
+    try:
+        _, test_score = MoodClassifier(backend='sgd').train_out_of_core(path, chunksize=5, n_epochs=1)
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+    assert test_score > 0.8
+
+@pytest.mark.parametrize('backend', ['hgb', 'sgd'])
+def test_loading_pickles_restores_the_backend(tmp_path, backend):
+    trained = MoodClassifier(backend=backend)
+    trained.train(generate_synthetic_dataset(500))
+    trained.save_model(str(tmp_path))
+
+    loaded = MoodClassifier()
+    assert loaded.load_model(str(tmp_path), use_artifact=False)
+    assert loaded.backend == backend
@@ -0,0 +1,73 @@
+from prediction_cache import PredictionCache
+
+class CountingClassifier:
+    """predict_mood stand-in that counts its calls"""
+    feature_columns = ['valence', 'energy']
+
+    def __init__(self, model_version='v1'):
+        self.model_version = model_version
+        self.calls = 0
+
+    def predict_mood(self, audio_features):
+        self.calls += 1
+        mood = 'Happy' if audio_features['valence'] > 0.5 else 'Sad'
+        return {'predicted_mood': mood, 'confidence': 0.9,
+                'all_probabilities': {'Happy': 0.9 if mood == 'Happy' else 0.1,
+                                      'Sad': 0.1 if mood == 'Happy' else 0.9}}
+
+def track(track_id, valence=0.8):
+    return {'id': track_id, 'valence': valence, 'energy': 0.5}
+
+def test_least_recently_used_entry_is_evicted():
+    classifier = CountingClassifier()
+    cache = PredictionCache(classifier, maxsize=2)
+    cache.predict_mood(track('a'))
+    cache.predict_mood(track('b'))
+    cache.predict_mood(track('a'))
+    cache.predict_mood(track('c'))
+    assert classifier.calls == 3
+    assert cache.stats()['evictions'] == 1
+
+    cache.predict_mood(track('a'))
+    assert classifier.calls == 3
+    cache.predict_mood(track('b'))
+    assert classifier.calls == 4
+
+def test_a_new_model_version_invalidates_the_cache():
+    classifier = CountingClassifier()
+    cache = PredictionCache(classifier)
+    cache.predict_mood(track('a'))
+    cache.predict_mood(track('a'))
+    assert classifier.calls == 1
+
+    classifier.model_version = 'v2'
+    cache.predict_mood(track('a'))
+    assert classifier.calls == 2
+    assert cache.stats()['model_version'] == 'v2'
+
+def test_results_persist_across_instances(tmp_path):
+    path = str(tmp_path / 'predictions.db')
+    first = PredictionCache(CountingClassifier(), path=path)
+    expected = first.predict_mood(track('a', valence=0.2))
+    first.close()
+
+    classifier = CountingClassifier()
+    second = PredictionCache(classifier, path=path)
+    assert second.predict_mood(track('a', valence=0.2)) == expected
+    assert classifier.calls == 0
+    second.close()
+
+    retrained = CountingClassifier('v2')
+    third = PredictionCache(retrained, path=path)
+    third.predict_mood(track('a', valence=0.2))
+    assert retrained.calls == 1
+    third.close()
+
+def test_modifying_a_result_does_not_change_the_cached_entry():
+    cache = PredictionCache(CountingClassifier())
+    first = cache.predict_mood(track('a'))
+    first['all_probabilities']['Happy'] = 0.0
+    first['predicted_mood'] = 'Sad'
+    second = cache.predict_mood(track('a'))
+    assert second['predicted_mood'] == 'Happy'
+    assert second['all_probabilities']['Happy'] == 0.9
@@ -0,0 +1,25 @@
+from demo import generate_synthetic_dataset
+from local_recommender import LocalRecommender
+from transition_playlists import TransitionGraph, TransitionPlaylistGenerator
+
+def test_cache_is_rebuilt_when_k_or_features_change(tmp_path):
+    df = generate_synthetic_dataset(600)
+    dataset = str(tmp_path / 'dataset.csv')
+    cache = str(tmp_path / 'graph.npz')
+    df.to_csv(dataset, index=False)
+
+    generator = TransitionPlaylistGenerator(LocalRecommender(dataset), cache_path=cache, k=10)
+    built_hash = TransitionGraph.load(cache).source_hash
+    assert generator.graph.k == 10
+
+    generator = TransitionPlaylistGenerator(LocalRecommender(dataset), cache_path=cache, k=5)
+    assert generator.graph.k == 5
+    assert TransitionGraph.load(cache).requested_k == 5
+
+    df.loc[0, 'energy'] += 0.1
+    df.to_csv(dataset, index=False)
+    generator = TransitionPlaylistGenerator(LocalRecommender(dataset), cache_path=cache, k=5)
+    assert TransitionGraph.load(cache).source_hash not in ('', built_hash)
+    row = list(generator.graph.track_ids).index(str(df.loc[0, 'track_id']))
+    assert abs(generator.graph.features[row] * generator.graph.scale + generator.graph.mean -
+               df.loc[0, generator.recommender.feature_columns].to_numpy(dtype=float)).max() < 1e-9
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Indexed SQLite catalog of collected tracks
+Stores the collectors' track rows in a SQLite file with indexes on mood and
+the main audio features, so feature-range queries such as "Calm tracks with
+tempo 60-80 and energy below 0.3" are answered without loading a CSV
+"""
+
+import argparse
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+# Column name -> SQLite type, in the collectors' CSV column order
+CATALOG_COLUMNS = {
+    'track_id': 'TEXT PRIMARY KEY',
+    'mood': 'TEXT',
+    'track_name': 'TEXT',
+    'artist': 'TEXT',
+    'album': 'TEXT',
+    'popularity': 'INTEGER',
+    'danceability': 'REAL',
+    'energy': 'REAL',
+    'key': 'INTEGER',
+    'loudness': 'REAL',
+    'mode': 'INTEGER',
+    'speechiness': 'REAL',
+    'acousticness': 'REAL',
+    'instrumentalness': 'REAL',
+    'liveness': 'REAL',
+    'valence': 'REAL',
+    'tempo': 'REAL',
+    'duration_ms': 'INTEGER',
+    'time_signature': 'INTEGER',
+    'preview_url': 'TEXT',
+    'image_url': 'TEXT'
+}
+INDEXED_FEATURES = ('valence', 'energy', 'tempo', 'popularity')
+
+def _quote(column):
+    """Quoted identifier of a known catalog column"""
+    if column not in CATALOG_COLUMNS:
+        raise ValueError(f"Unknown catalog column: {column}")
+    return f'"{column}"'
+
+class TrackCatalog:
+    """Track rows keyed by track_id in a SQLite file
+
+    Each indexed feature has an index of its own, for range queries across all
+    moods, and a (mood, feature) index, so a query for one mood only visits
+    that mood's rows inside the feature range. Connections may be shared
+    between threads; calls are serialized with a lock.
+    """
+    def __init__(self, path='data/track_catalog.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        columns = ', '.join(f'{_quote(column)} {sql_type}' for column, sql_type in CATALOG_COLUMNS.items())
+        with self._db:
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS tracks ({columns})")
+            self._db.execute('CREATE INDEX IF NOT EXISTS idx_tracks_mood ON tracks ("mood")')
+            for feature in INDEXED_FEATURES:
+                self._db.execute(f'CREATE INDEX IF NOT EXISTS idx_tracks_{feature} ON tracks ("{feature}")')
+                self._db.execute(f'CREATE INDEX IF NOT EXISTS idx_tracks_mood_{feature} '
+                                 f'ON tracks ("mood", "{feature}")')
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+
+    def upsert(self, tracks):
+        """Insert or update track rows in one transaction; returns the number of rows
+
+        tracks is a DataFrame or an iterable of dicts with a track_id. Only the
+        catalog columns present are written, so a partial row updates those
+        columns and keeps the others. Missing values are stored as NULL.
+        """
+        df = tracks if isinstance(tracks, pd.DataFrame) else pd.DataFrame(list(tracks))
+        if df.empty:
+            return 0
+        if 'track_id' not in df.columns:
+            raise ValueError("Tracks need a track_id")
+        columns = [column for column in CATALOG_COLUMNS if column in df.columns]
+        updates = ', '.join(f'{_quote(column)} = excluded.{_quote(column)}' for column in columns
+                            if column != 'track_id')
+        sql = (f"INSERT INTO tracks ({', '.join(map(_quote, columns))}) "
+               f"VALUES ({', '.join('?' * len(columns))}) "
+               f"ON CONFLICT (track_id) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING"))
+        # Later duplicates of a track win, as with repeated upserts
+        df = df.drop_duplicates(subset=['track_id'], keep='last')[columns]
+        rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        with self._lock, self._db:
+            self._db.executemany(sql, rows)
+        return len(df)
+
+    def import_csv(self, filepath, chunksize=100000):
+        """Upsert a collector CSV in chunks; returns the number of rows"""
+        total = 0
+        for chunk in pd.read_csv(filepath, chunksize=chunksize):
+            total += self.upsert(chunk)
+        # Refresh the statistics the query planner uses to choose an index
+        with self._lock:
+            self._db.execute("ANALYZE")
+        return total
+
+    def _where(self, mood, ranges):
+        """WHERE clause and parameters for a mood and {column: (low, high)} ranges"""
+        clauses, params = [], []
+        if mood is not None:
+            clauses.append('"mood" = ?')
+            params.append(mood)
+        for column, (low, high) in ranges.items():
+            if low is not None:
+                clauses.append(f'{_quote(column)} >= ?')
+                params.append(low)
+            if high is not None:
+                clauses.append(f'{_quote(column)} <= ?')
+                params.append(high)
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def query(self, mood=None, columns=None, order_by=None, limit=None, **ranges):
+        """Track dicts matching a mood and inclusive feature ranges
+
+        Ranges are keyword arguments column=(low, high); None leaves a side
+        open, e.g. query(mood='Calm', tempo=(60, 80), energy=(None, 0.3)).
+        columns selects the returned columns (default all), and order_by is a
+        column name, prefixed with '-' for descending order.
+        """
+        selected = ', '.join(map(_quote, columns)) if columns else '*'
+        where, params = self._where(mood, ranges)
+        sql = f"SELECT {selected} FROM tracks{where}"
+        if order_by:
+            descending = order_by.startswith('-')
+            sql += f" ORDER BY {_quote(order_by.lstrip('-'))}{' DESC' if descending else ''}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, params)]
+
+    def count(self, mood=None, **ranges):
+        """Number of tracks matching a mood and inclusive feature ranges"""
+        where, params = self._where(mood, ranges)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM tracks{where}", params).fetchone()[0]
+
+    def get(self, track_id):
+        """One track dict, or None"""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM tracks WHERE track_id = ?", (track_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def main():
+    """Import collector CSVs into the catalog or query it"""
+    parser = argparse.ArgumentParser(description="SQLite track catalog")
+    parser.add_argument('--db', default='data/track_catalog.db', help="Catalog database file")
+    parser.add_argument('--import', dest='imports', nargs='+', default=[], metavar='CSV',
+                        help="Collector CSV files to upsert into the catalog")
+    parser.add_argument('--mood', help="Only tracks of this mood")
+    parser.add_argument('--range', nargs=3, action='append', default=[], metavar=('COLUMN', 'LOW', 'HIGH'),
+                        help="Inclusive feature range; '-' leaves a side open (repeatable)")
+    parser.add_argument('--order-by', help="Sort column, '-' prefix for descending")
+    parser.add_argument('--limit', type=int, default=20, help="Maximum tracks printed")
+    args = parser.parse_args()
+
+    with TrackCatalog(args.db) as catalog:
+        for filepath in args.imports:
+            start = time.perf_counter()
+            rows = catalog.import_csv(filepath)
+            print(f"Imported {rows:,} tracks from {filepath} in {time.perf_counter() - start:.2f}s")
+
+        if args.mood or args.range or not args.imports:
+            ranges = {column: tuple(None if value == '-' else float(value) for value in (low, high))
+                      for column, low, high in args.range}
+            start = time.perf_counter()
+            tracks = catalog.query(mood=args.mood, order_by=args.order_by, limit=args.limit, **ranges)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{len(tracks)} tracks in {elapsed:.1f} ms ({len(catalog):,} in catalog)")
+            for track in tracks:
+                print(f"  {track['track_id']}  {track.get('track_name') or ''}  "
+                      f"valence={track['valence']} energy={track['energy']} tempo={track['tempo']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import numpy as np
+
+# One Camelot wheel step costs as much as a tempo jump of TEMPO_STEP BPM
+TEMPO_STEP = 6.0
+
+def camelot_numbers(keys, modes):
+    """Camelot wheel position (1-12) and letter (0 = A/minor, 1 = B/major) per track
+
+    keys are Spotify pitch classes (0 = C, -1 = unknown) and modes 1 for major,
+    0 for minor. Unknown keys or modes get number 0.
+    """
+    keys = np.asarray(keys, dtype=np.float64)
+    modes = np.asarray(modes, dtype=np.float64)
+    known = np.isfinite(keys) & (keys >= 0) & np.isfinite(modes)
+    pitch = np.where(known, keys, 0).astype(np.int64)
+    major = np.where(known, modes, 1).astype(np.int64) == 1
+    # Each step clockwise is a fifth up; C major is 8B and its relative minor, A minor, is 8A
+    numbers = (7 * np.where(major, pitch, pitch + 3) + 7) % 12 + 1
+    return np.where(known, numbers, 0), major.astype(np.int64)
+
+def key_distances(keys, modes, unknown_cost=1.0):
+    """(n, n) Camelot wheel steps between tracks' keys
+
+    Moving one position around the wheel or switching between a key and its
+    relative major/minor is one step. Pairs with an unknown key cost unknown_cost.
+    """
+    numbers, letters = camelot_numbers(keys, modes)
+    around = np.abs(numbers[:, None] - numbers[None, :])
+    steps = np.minimum(around, 12 - around) + (letters[:, None] != letters[None, :])
+    unknown = (numbers == 0)
+    return np.where(unknown[:, None] | unknown[None, :], unknown_cost, steps).astype(np.float64)
+
+def tempo_distances(tempos, half_double=True):
+    """(n, n) BPM differences, optionally treating half and double time as matching
+
+    Pairs with an unknown tempo cost nothing.
+    """
+    tempos = np.asarray(tempos, dtype=np.float64)
+    differences = np.abs(tempos[:, None] - tempos[None, :])
+    if half_double:
+        differences = np.minimum(differences, np.abs(2 * tempos[:, None] - tempos[None, :]))
+        differences = np.minimum(differences, np.abs(tempos[:, None] - 2 * tempos[None, :]))
+    return np.nan_to_num(differences, nan=0.0)
+
+def nearest_neighbor_tour(distances, start=0):
+    """Closed tour that always moves to the nearest unvisited node"""
+    n = len(distances)
+    visited = np.zeros(n, dtype=bool)
+    tour = np.empty(n, dtype=np.int64)
+    current = start
+    for position in range(n):
+        tour[position] = current
+        visited[current] = True
+        if position < n - 1:
+            current = int(np.argmin(np.where(visited, np.inf, distances[current])))
+    return tour
+
+def two_opt(distances, tour, max_passes=50, tolerance=1e-9):
+    """Improve a closed tour with 2-opt moves until none helps or max_passes runs out
+
+    For each position i, the gain of reversing tour[i + 1:j + 1] is computed
+    for every j at once and the best improving move is applied.
+    """
+    tour = np.array(tour, dtype=np.int64)
+    n = len(tour)
+    if n < 4:
+        return tour
+    for _ in range(max_passes):
+        improved = False
+        for i in range(n - 2):
+            a, b = tour[i], tour[i + 1]
+            # Replace edges (a, b) and (c, d) with (a, c) and (b, d)
+            c = tour[i + 2:]
+            d = np.roll(tour, -1)[i + 2:]
+            gains = distances[a, b] + distances[c, d] - distances[a, c] - distances[b, d]
+            if i == 0:
+                # (a, b) and (tour[-1], a) share a; reversing everything is a no-op
+                gains[-1] = 0.0
+            j = int(np.argmax(gains))
+            if gains[j] > tolerance:
+                j += i + 2
+                tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1].copy()
+                improved = True
+        if not improved:
+            break
+    return tour
+
+def sequence_order(distances):
+    """Order of an open path through all nodes with a low total distance
+
+    A dummy node at zero distance from every node turns the open path into a
+    closed tour; the tour is solved with nearest neighbor plus 2-opt and cut
+    open at the dummy.
+    """
+    n = len(distances)
+    if n < 3:
+        return np.arange(n)
+    augmented = np.zeros((n + 1, n + 1))
+    augmented[:n, :n] = distances
+    tour = two_opt(augmented, nearest_neighbor_tour(augmented, start=n))
+    cut = int(np.flatnonzero(tour == n)[0])
+    return np.concatenate([tour[cut + 1:], tour[:cut]])
+
+def sequence_tracks(tracks, key_weight=1.0, tempo_weight=1.0, tempo_step=TEMPO_STEP):
+    """Reorder track dicts for DJ-style playback: small tempo jumps, compatible keys
+
+    Uses each track's 'key', 'mode' and 'tempo' where present. The cost of a
+    transition is key_weight * Camelot steps + tempo_weight * BPM jump / tempo_step.
+    """
+    if len(tracks) < 3:
+        return list(tracks)
+
+    def column(name):
+        return [np.nan if track.get(name) is None else track[name] for track in tracks]
+
+    distances = (key_weight * key_distances(column('key'), column('mode')) +
+                 tempo_weight * tempo_distances(column('tempo')) / tempo_step)
+    return [tracks[i] for i in sequence_order(distances)]
@@ -1,8 +1,23 @@
-from mood_classifier import MoodClassifier
+from mood_classifier import BACKENDS, MoodClassifier
+from training_profiler import TrainingProfiler
+import argparse
 import os
 
 def main():
     """Train and save the mood classification model"""
+    parser = argparse.ArgumentParser(description="Train the Moodify mood classifier")
+    parser.add_argument('--backend', choices=list(BACKENDS), default='rf',
+                        help="Estimator backend to train")
+    parser.add_argument('--out-of-core', action='store_true',
+                        help="Stream the dataset in chunks instead of loading it into memory")
+    parser.add_argument('--chunksize', type=int, default=100000,
+                        help="Rows per chunk when training out of core")
+    parser.add_argument('--profile', metavar='REPORT_JSON',
+                        help="Profile each training phase and write the report to this file")
+    parser.add_argument('--trace-allocations', action='store_true',
+                        help="With --profile, also trace allocations with tracemalloc (inflates timings)")
+    args = parser.parse_args()
+    
     print("Starting Moodify model training...")
     
     # Check if dataset exists
@@ -13,11 +28,19 @@ def main():
         return
     
     # Initialize classifier
-    classifier = MoodClassifier()
+    classifier = MoodClassifier(backend=args.backend)
     
     try:
         # Train the model
-        train_acc, test_acc = classifier.train()
+        if args.out_of_core:
+            train_acc, test_acc = classifier.train_out_of_core(dataset_path, chunksize=args.chunksize)
+        else:
+            profiler = TrainingProfiler(trace_allocations=args.trace_allocations) if args.profile else None
+            train_acc, test_acc = classifier.train(filepath=dataset_path, profiler=profiler)
+            if profiler is not None:
+                profiler.print_report()
+                profiler.save(args.profile)
+                print(f"Training profile written to {args.profile}")
         
         # Save the trained model
         classifier.save_model()
@@ -0,0 +1,110 @@
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+def _peak_rss_mb():
+    """Peak resident set size of this process so far, or None where unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+class TrainingProfiler:
+    """Records wall time, CPU time and memory for each phase of a training run
+
+    Pass an instance to MoodClassifier.train(profiler=...). Memory is sampled
+    from the process's peak resident set size, which costs nothing while the
+    phase runs: peak_rss_mb is the peak at the end of the phase and
+    rss_growth_mb how far the phase raised it. trace_allocations=True also
+    records each phase's peak Python/NumPy allocation with tracemalloc, which
+    is more precise but slows allocation-heavy phases severalfold, so the
+    timings of such a run are inflated.
+    """
+    def __init__(self, trace_allocations=False):
+        self.trace_allocations = trace_allocations
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        """Context manager that measures one named phase"""
+        started_tracing = False
+        if self.trace_allocations:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start_rss = _peak_rss_mb()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start_wall
+            cpu = time.process_time() - start_cpu
+            peak_rss = _peak_rss_mb()
+            record = {
+                'phase': name,
+                'wall_time_s': wall,
+                'cpu_time_s': cpu,
+                'peak_rss_mb': peak_rss,
+                'rss_growth_mb': peak_rss - start_rss if peak_rss is not None else None
+            }
+            if self.trace_allocations:
+                peak = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+                record['peak_traced_mb'] = max(peak - start_memory, 0) / (1024 * 1024)
+            self.phases.append(record)
+
+    def report(self):
+        """Structured report with per-phase measurements and their share of wall time"""
+        total_wall = sum(p['wall_time_s'] for p in self.phases)
+        phases = [
+            dict(p, wall_time_share=p['wall_time_s'] / total_wall if total_wall else 0.0)
+            for p in self.phases
+        ]
+        rss = [p['peak_rss_mb'] for p in self.phases if p['peak_rss_mb'] is not None]
+        report = {
+            'phases': phases,
+            'total_wall_time_s': total_wall,
+            'total_cpu_time_s': sum(p['cpu_time_s'] for p in self.phases),
+            'max_peak_rss_mb': max(rss, default=None),
+            'slowest_phase': max(phases, key=lambda p: p['wall_time_s'])['phase'] if phases else None,
+            'traced_allocations': self.trace_allocations
+        }
+        if self.trace_allocations:
+            report['note'] = "tracemalloc was on; wall and CPU times are inflated"
+        return report
+
+    def print_report(self):
+        """Print the report as a table"""
+        report = self.report()
+
+        def mb(value):
+            return f"{value:.1f}" if value is not None else "n/a"
+
+        print("\nTraining Profile:")
+        traced_header = f"{'traced (MB)':>13}" if self.trace_allocations else ""
+        print(f"{'phase':<18}{'wall (s)':>10}{'cpu (s)':>10}{'peak RSS (MB)':>15}{'growth (MB)':>13}"
+              f"{traced_header}{'share':>8}")
+        for p in report['phases']:
+            traced = f"{p['peak_traced_mb']:>13.1f}" if self.trace_allocations else ""
+            print(f"{p['phase']:<18}{p['wall_time_s']:>10.3f}{p['cpu_time_s']:>10.3f}"
+                  f"{mb(p['peak_rss_mb']):>15}{mb(p['rss_growth_mb']):>13}{traced}{p['wall_time_share']:>8.1%}")
+        print(f"{'total':<18}{report['total_wall_time_s']:>10.3f}{report['total_cpu_time_s']:>10.3f}")
+        if self.trace_allocations:
+            print(f"Note: {report['note']}")
+
+    def save(self, filepath):
+        """Write the report as JSON"""
+        with open(filepath, 'w') as f:
+            json.dump(self.report(), f, indent=2)
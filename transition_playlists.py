@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Mood-transition playlists over the local catalog
+Builds (or reuses) the cached k-NN graph over the collected dataset and prints
+a playlist that moves gradually from one mood to another
+"""
+
+import argparse
+import hashlib
+import os
+import time
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.neighbors import KDTree
+
+from local_recommender import LocalRecommender
+
+def features_hash(feature_columns, features):
+    """Short content hash of feature column names and raw (n_tracks, n_features) values"""
+    digest = hashlib.sha1('\0'.join(feature_columns).encode('utf-8'))
+    digest.update(np.ascontiguousarray(features, dtype=np.float64).tobytes())
+    return digest.hexdigest()[:16]
+
+class TransitionGraph:
+    """Sparse k-nearest-neighbor graph over standardized track features
+
+    Row i of neighbors/distances holds track i's k nearest other tracks, and
+    bridges holds extra (row, row, distance) edges joining clusters that the
+    k-NN edges leave disconnected. Paths treat every edge as undirected.
+    requested_k is the k the graph was built with, before it was capped by the
+    number of tracks, and source_hash identifies the raw features it was built
+    from; both are saved with it so a stale cache can be detected.
+    """
+    def __init__(self, track_ids, features, neighbors, distances, mean, scale, bridges=None,
+                 requested_k=None, source_hash=''):
+        self.track_ids = np.asarray(track_ids, dtype=str)
+        self.features = features
+        self.neighbors = neighbors
+        self.distances = distances
+        self.mean = mean
+        self.scale = scale
+        self.bridges = np.empty((0, 3)) if bridges is None else bridges
+        self.requested_k = requested_k
+        self.source_hash = source_hash
+        self._adjacency = None
+
+    @property
+    def k(self):
+        return self.neighbors.shape[1]
+
+    @classmethod
+    def build(cls, track_ids, features, k=10):
+        """Build the graph from raw (n_tracks, n_features) features"""
+        features = np.asarray(features, dtype=np.float64)
+        mean = features.mean(axis=0)
+        scale = features.std(axis=0)
+        scale[scale == 0] = 1.0
+        normalized = (features - mean) / scale
+        distances, neighbors = KDTree(normalized).query(normalized, k=min(k, len(normalized) - 1) + 1)
+        # The nearest neighbor of every track is itself
+        graph = cls(track_ids, normalized, neighbors[:, 1:].astype(np.int32),
+                    distances[:, 1:].astype(np.float32), mean, scale, requested_k=k)
+        graph.connect_components()
+        return graph
+
+    def normalize(self, features):
+        return (np.asarray(features, dtype=np.float64) - self.mean) / self.scale
+
+    def _edges(self):
+        """All undirected edges as (sources, destinations, distances), each edge listed once"""
+        rows = np.repeat(np.arange(len(self.neighbors), dtype=np.int64), self.k)
+        sources = np.concatenate([rows, self.bridges[:, 0].astype(np.int64)])
+        destinations = np.concatenate([self.neighbors.ravel().astype(np.int64), self.bridges[:, 1].astype(np.int64)])
+        distances = np.concatenate([self.distances.ravel().astype(np.float64), self.bridges[:, 2]])
+        return sources, destinations, distances
+
+    def connect_components(self):
+        """Add bridge edges until the graph is connected
+
+        Each round links every component to the nearest track outside it, which
+        at least halves the number of components.
+        """
+        n = len(self.features)
+        while True:
+            sources, destinations, _ = self._edges()
+            graph = coo_matrix((np.ones(len(sources)), (sources, destinations)), shape=(n, n))
+            n_components, labels = connected_components(graph, directed=False)
+            if n_components <= 1:
+                break
+            bridges = []
+            for component in range(n_components):
+                inside = np.flatnonzero(labels == component)
+                outside = np.flatnonzero(labels != component)
+                distances, nearest = KDTree(self.features[outside]).query(self.features[inside], k=1)
+                best = int(np.argmin(distances[:, 0]))
+                bridges.append((inside[best], outside[nearest[best, 0]], distances[best, 0]))
+            self.bridges = np.vstack([self.bridges, np.array(bridges, dtype=np.float64)])
+        self._adjacency = None
+
+    def add_tracks(self, track_ids, features):
+        """Add tracks (raw features) without rebuilding the existing neighbor lists
+
+        New tracks get exact k-NN lists. An existing track's list is updated when
+        a new track lands within its current k-th neighbor distance, checked for
+        the existing tracks among each new track's 2k nearest neighbors.
+        """
+        if len(track_ids) == 0:
+            return
+        new = self.normalize(features)
+        n_old = len(self.features)
+        self.features = np.vstack([self.features, new])
+        self.track_ids = np.concatenate([self.track_ids, np.asarray(track_ids, dtype=str)])
+
+        k = self.k
+        distances, neighbors = KDTree(self.features).query(new, k=min(2 * k + 1, len(self.features)))
+        new_neighbors = np.empty((len(new), k), dtype=np.int32)
+        new_distances = np.empty((len(new), k), dtype=np.float32)
+        for i, row in enumerate(range(n_old, n_old + len(new))):
+            others = neighbors[i] != row
+            new_neighbors[i] = neighbors[i][others][:k]
+            new_distances[i] = distances[i][others][:k]
+            for neighbor, distance in zip(neighbors[i][others], distances[i][others]):
+                if neighbor < n_old and distance < self.distances[neighbor, -1]:
+                    self._insert_neighbor(neighbor, row, distance)
+
+        self.neighbors = np.vstack([self.neighbors, new_neighbors])
+        self.distances = np.vstack([self.distances, new_distances])
+        self.connect_components()
+
+    def _insert_neighbor(self, row, neighbor, distance):
+        position = np.searchsorted(self.distances[row], distance)
+        self.neighbors[row, position + 1:] = self.neighbors[row, position:-1].copy()
+        self.distances[row, position + 1:] = self.distances[row, position:-1].copy()
+        self.neighbors[row, position] = neighbor
+        self.distances[row, position] = distance
+
+    def _adjacency_lists(self):
+        """CSR adjacency (indptr, destinations, weights) over both edge directions"""
+        if self._adjacency is None:
+            sources, destinations, distances = self._edges()
+            sources, destinations = np.concatenate([sources, destinations]), np.concatenate([destinations, sources])
+            # Squared distances favor several small steps over one large jump
+            weights = np.concatenate([distances, distances]) ** 2
+            order = np.argsort(sources, kind='stable')
+            indptr = np.searchsorted(sources[order], np.arange(len(self.features) + 1))
+            self._adjacency = (indptr, destinations[order], weights[order])
+        return self._adjacency
+
+    def shortest_path(self, source, target, max_hops):
+        """Rows on the cheapest path from source to target using at most max_hops edges
+
+        Hop-bounded Bellman-Ford: round h relaxes only the edges leaving tracks
+        whose cost improved in round h - 1, so each round touches just the
+        search frontier. Returns [] if target is not reachable within max_hops.
+        """
+        indptr, adjacent, weights = self._adjacency_lists()
+        cost = np.full(len(self.features), np.inf)
+        cost[source] = 0.0
+        frontier = np.array([source])
+        rounds = []
+        for _ in range(max_hops):
+            # Gather the frontier's edges as one flat index array
+            starts, counts = indptr[frontier], indptr[frontier + 1] - indptr[frontier]
+            edges = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            origins = np.repeat(frontier, counts)
+            candidates = cost[origins] + weights[edges]
+            destinations = adjacent[edges]
+
+            # Weights are non-negative, so a candidate costing more than the best
+            # path to target found so far can never be part of a cheaper one
+            keep = (candidates < cost[destinations]) & (candidates < cost[target])
+            if not keep.any():
+                break
+            candidates, destinations, origins = candidates[keep], destinations[keep], origins[keep]
+            # Cheapest candidate per destination
+            order = np.lexsort((candidates, destinations))
+            first = order[np.r_[True, destinations[order][1:] != destinations[order][:-1]]]
+            frontier = destinations[first]
+            cost[frontier] = candidates[first]
+            rounds.append((frontier, origins[first]))
+
+        if not np.isfinite(cost[target]):
+            return []
+        # Walk back through the rounds; a track not updated in a round kept the
+        # path it had in the round before
+        path = [target]
+        node = target
+        for updated, predecessors in reversed(rounds):
+            if node == source:
+                break
+            position = np.searchsorted(updated, node)
+            if position < len(updated) and updated[position] == node:
+                node = int(predecessors[position])
+                path.append(node)
+        return path[::-1]
+
+    def save(self, path):
+        np.savez(path, track_ids=self.track_ids, features=self.features, neighbors=self.neighbors,
+                 distances=self.distances, mean=self.mean, scale=self.scale, bridges=self.bridges,
+                 requested_k=-1 if self.requested_k is None else self.requested_k,
+                 source_hash=self.source_hash)
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved graph; caches written without requested_k or source_hash load as unknown"""
+        with np.load(path, allow_pickle=False) as data:
+            requested_k = int(data['requested_k']) if 'requested_k' in data.files else -1
+            source_hash = str(data['source_hash']) if 'source_hash' in data.files else ''
+            return cls(data['track_ids'], data['features'], data['neighbors'], data['distances'],
+                       data['mean'], data['scale'], data['bridges'],
+                       requested_k=None if requested_k < 0 else requested_k, source_hash=source_hash)
+
+class TransitionPlaylistGenerator:
+    """Playlists that move gradually from one mood to another through the local catalog
+
+    Uses a LocalRecommender's tracks and mood targets. The k-NN graph is cached
+    at cache_path; tracks added to the dataset since the cache was written are
+    added to it incrementally instead of rebuilding it. The cache is rebuilt
+    when it was built with another k or feature columns, or when any of its
+    tracks was removed from the dataset or changed its feature values.
+    """
+    def __init__(self, recommender, cache_path='data/transition_graph.npz', k=10):
+        self.recommender = recommender
+        track_ids = recommender.track_ids.astype(str)
+        features = recommender.tracks[recommender.feature_columns].to_numpy(dtype=np.float64)
+        dataset_rows = {track_id: row for row, track_id in enumerate(track_ids)}
+
+        def source_rows(graph):
+            """Dataset rows of the graph's tracks in graph order, -1 for tracks no longer present"""
+            return np.array([dataset_rows.get(track_id, -1) for track_id in graph.track_ids], dtype=np.int64)
+
+        self.graph = TransitionGraph.load(cache_path) if os.path.exists(cache_path) else None
+        if self.graph is not None:
+            rows = source_rows(self.graph)
+            if (self.graph.requested_k != k or (rows < 0).any() or
+                    self.graph.source_hash != features_hash(recommender.feature_columns, features[rows])):
+                self.graph = None
+
+        changed = True
+        if self.graph is None:
+            self.graph = TransitionGraph.build(track_ids, features, k=k)
+        else:
+            missing = ~np.isin(track_ids, self.graph.track_ids)
+            changed = bool(missing.any())
+            if changed:
+                self.graph.add_tracks(track_ids[missing], features[missing])
+        if changed:
+            self.graph.source_hash = features_hash(recommender.feature_columns,
+                                                   features[source_rows(self.graph)])
+            self.graph.save(cache_path)
+        self._rows = {track_id: row for row, track_id in enumerate(self.graph.track_ids)}
+
+    def _anchor(self, mood):
+        """Graph row of the track nearest the mood's target"""
+        if mood not in self.recommender.mood_targets:
+            raise ValueError(f"Unknown mood: {mood}")
+        track_ids, _ = self.recommender.nearest(self.recommender.mood_targets[mood], k=1)
+        return self._rows[str(track_ids[0])]
+
+    def transition_playlist(self, from_mood, to_mood, length=15, max_hops=200):
+        """Track IDs of a playlist of at most length tracks moving from from_mood to to_mood
+
+        The path between the two moods is searched with at most max_hops steps
+        and then sampled at evenly spaced points, endpoints included.
+        """
+        path = self.graph.shortest_path(self._anchor(from_mood), self._anchor(to_mood), max_hops)
+        if len(path) > length:
+            path = [path[i] for i in np.unique(np.linspace(0, len(path) - 1, length).round().astype(int))]
+        return [str(self.graph.track_ids[row]) for row in path]
+
+def main():
+    """Print a playlist moving from one mood to another"""
+    parser = argparse.ArgumentParser(description="Mood-transition playlist from the local dataset")
+    parser.add_argument('--dataset', default='data/mood_music_dataset.csv', help="Collected dataset CSV")
+    parser.add_argument('--cache', default='data/transition_graph.npz', help="k-NN graph cache file")
+    parser.add_argument('-k', type=int, default=10, help="Neighbors per track in the graph")
+    parser.add_argument('--from', dest='from_mood', required=True, help="Starting mood")
+    parser.add_argument('--to', dest='to_mood', required=True, help="Final mood")
+    parser.add_argument('--length', type=int, default=15, help="Maximum tracks in the playlist")
+    parser.add_argument('--max-hops', type=int, default=200, help="Maximum steps of the path search")
+    args = parser.parse_args()
+
+    try:
+        recommender = LocalRecommender(args.dataset)
+    except ValueError as e:
+        print(e)
+        return
+    start = time.perf_counter()
+    generator = TransitionPlaylistGenerator(recommender, cache_path=args.cache, k=args.k)
+    print(f"Graph over {len(generator.graph.track_ids):,} tracks ready in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    try:
+        playlist = generator.transition_playlist(args.from_mood, args.to_mood, length=args.length,
+                                                 max_hops=args.max_hops)
+    except ValueError as e:
+        print(f"{e}. Available moods: {', '.join(sorted(recommender.mood_targets))}")
+        return
+    elapsed = (time.perf_counter() - start) * 1000
+    if not playlist:
+        print(f"No path from {args.from_mood} to {args.to_mood} within {args.max_hops} hops")
+        return
+    print(f"{args.from_mood} -> {args.to_mood}: {len(playlist)} tracks in {elapsed:.1f} ms")
+    for track_id in playlist:
+        track = recommender.get_track_info(track_id)
+        features = recommender.get_track_features(track_id)
+        print(f"  {track_id}  {track['name'] or ''} - {track['artist'] or ''}  "
+              f"valence={features['valence']:.2f} energy={features['energy']:.2f}")
+
+if __name__ == "__main__":
+    main()